@@ -6,10 +6,28 @@ Test different authentication methods and analyze the complete flow
 
 import requests
 import os
+from concurrent.futures import ThreadPoolExecutor
+from types import MappingProxyType
 from dotenv import load_dotenv
 
 load_dotenv()
 
+CEDROTECH_USERNAME = os.getenv('CEDROTECH_USERNAME')
+CEDROTECH_PASSWORD = os.getenv('CEDROTECH_PASSWORD')
+
+# Order fields shared by every test order
+_ORDER_BASE = MappingProxyType({
+    "market": "XBSP",
+    "quote": "PETR4",
+    "side": "Buy",
+    "bypasssuitability": "true",
+    "traderate": "0"
+})
+
+def preview_body(response, limit=500):
+    """Decode at most `limit` bytes of a response body for diagnostic output"""
+    return response.content[:limit].decode('utf-8', 'replace')
+
 def test_advanced_auth():
     """Test advanced authentication scenarios"""
     print("="*60)
@@ -18,8 +36,8 @@ def test_advanced_auth():
     print()
     
     base_url = "https://webfeeder.cedrotech.com"
-    username = os.getenv('CEDROTECH_USERNAME') 
-    password = os.getenv('CEDROTECH_PASSWORD')
+    username = CEDROTECH_USERNAME
+    password = CEDROTECH_PASSWORD
     
     # Test 1: Check if we need to maintain session cookies
     print("🧪 TEST 1: Authentication with session management")
@@ -28,13 +46,14 @@ def test_advanced_auth():
     session = requests.Session()
     
     try:
-        url = f"{base_url}/SignIn?login={username}&password={password}"
+        url = f"{base_url}/SignIn"
+        auth_params = {"login": username, "password": password}
         headers = {"accept": "application/json"}
         
-        response = session.post(url, headers=headers)
+        response = session.post(url, params=auth_params, headers=headers)
         
         print(f"   Status: {response.status_code}")
-        print(f"   Response: {response.text}")
+        print(f"   Response: {preview_body(response)}")
         print(f"   Cookies: {dict(response.cookies)}")
         
         # If we got cookies, test if we can use them for API calls
@@ -44,24 +63,17 @@ def test_advanced_auth():
             # Test order placement with cookies
             order_url = f"{base_url}/services/negotiation/sendNewOrderSingle"
             order_params = {
-                "market": "XBSP",
-                "quote": "PETR4", 
+                **_ORDER_BASE,
                 "qtd": "1",
                 "type": "Market",
-                "side": "Buy",
                 "username": username,
-                "bypasssuitability": "true",
-                "traderate": "0",
                 "orderstrategy": "DAYTRADE",
                 "timeinforce": "DAY"
             }
             
-            query_string = "&".join([f"{k}={v}" for k, v in order_params.items()])
-            full_order_url = f"{order_url}?{query_string}"
-            
-            order_response = session.post(full_order_url, headers={"accept": "application/json"})
+            order_response = session.post(order_url, params=order_params, headers={"accept": "application/json"})
             print(f"   Order test status: {order_response.status_code}")
-            print(f"   Order test response: {order_response.text[:200]}...")
+            print(f"   Order test response: {preview_body(order_response, 200)}...")
             
     except Exception as e:
         print(f"   ERROR: {e}")
@@ -79,13 +91,26 @@ def test_advanced_auth():
         "/SignIn",  # current (for comparison)
     ]
     
-    for endpoint in alt_endpoints:
+    # Separate session so Test 1 cookies don't leak into these probes
+    alt_session = requests.Session()
+    
+    def probe_endpoint(endpoint):
         try:
-            url = f"{base_url}{endpoint}?login={username}&password={password}"
-            response = requests.post(url, headers={"accept": "application/json"})
-            print(f"   {endpoint}: Status {response.status_code}, Response: {response.text}")
+            url = f"{base_url}{endpoint}"
+            auth_params = {"login": username, "password": password}
+            return endpoint, alt_session.post(url, params=auth_params, headers={"accept": "application/json"}), None
         except Exception as e:
-            print(f"   {endpoint}: ERROR - {e}")
+            return endpoint, None, e
+    
+    # Fire all probes at once over the keep-alive session, then report in order
+    with ThreadPoolExecutor(max_workers=len(alt_endpoints)) as executor:
+        probe_results = list(executor.map(probe_endpoint, alt_endpoints))
+    
+    for endpoint, response, error in probe_results:
+        if error:
+            print(f"   {endpoint}: ERROR - {error}")
+        else:
+            print(f"   {endpoint}: Status {response.status_code}, Response: {preview_body(response)}")
     
     print()
     
@@ -97,26 +122,22 @@ def test_advanced_auth():
         # Your original working example format
         order_url = f"{base_url}/services/negotiation/sendNewOrderSingle"
         params = {
-            "market": "XBSP",
-            "price": "30.57", 
-            "quote": "PETR4",
+            **_ORDER_BASE,
+            "price": "30.57",
             "qtd": "2",
             "type": "Start",
-            "side": "Buy",
-            "username": username,
-            "bypasssuitability": "true",
-            "traderate": "0"
+            "username": username
         }
         
-        query_string = "&".join([f"{k}={v}" for k, v in params.items()])
-        full_url = f"{order_url}?{query_string}"
+        request = requests.Request("POST", order_url, params=params, headers={"accept": "application/json"}).prepare()
         
-        print(f"   Testing: {full_url}")
+        print(f"   Testing: {request.url}")
         
-        response = requests.post(full_url, headers={"accept": "application/json"})
+        with requests.Session() as order_session:
+            response = order_session.send(request)
         
         print(f"   Status: {response.status_code}")
-        print(f"   Response: {response.text}")
+        print(f"   Response: {preview_body(response)}")
         
         if response.status_code == 200:
             print("   ✅ Order endpoint accessible without explicit auth!")
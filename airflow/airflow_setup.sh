@@ -1,2 +1,3 @@
+airflow pools set robot_pool 1 "Robot singleton"
 airflow webserver -D --stdout airflow/airflow-webserver.log
 airflow scheduler -D --stdout airflow/airflow-scheduler.logs
\ No newline at end of file
@@ -14,15 +14,27 @@ default_args = {
 continuous_dag = DAG(
     dag_id = 'continuous_robot',
     default_args=default_args,
-    description='Run the robot logic frequently to check for trade signals',
-    schedule='* 13-20 * * 1-5',  # Every minute, Mon-Fri, 13:00-20:59 UTC (market hours)
+    description='Start the robot once per trading day; it checks for trade signals until the close',
+    # Once a day, Mon-Fri, at 13:00 UTC (market open). robot.py's monitor_and_trade
+    # is one long process per session: it polls on its own 5-minute cycle and only
+    # exits after the market closes, so more frequent dispatches would just queue
+    # behind the running robot
+    schedule='0 13 * * 1-5',
     start_date=datetime(2025, 5, 21),
     catchup=False,
+    # Never run two robots at once - a slow run must not overlap the next one
+    max_active_runs=1,
+    max_active_tasks=1,
 )
 
 run_robot = BashOperator(
     task_id='run_robot',
     bash_command='python3 /mnt/c/Users/USUARIO/Desktop/workspace/fa_trading_bckend/robot.py',
+    # Single-slot pool (created in airflow_setup.sh):
+    #   airflow pools set robot_pool 1 "Robot singleton"
+    # No execution_timeout: the robot trades until the close and must be left to
+    # run force_close_all_positions itself rather than be killed mid-order
+    pool='robot_pool',
     dag=continuous_dag,
 )
 
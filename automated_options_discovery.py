@@ -5,13 +5,98 @@ Comprehensive system to discover and analyze options for trading integration
 """
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import json
+import logging
+import orjson
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
+from datetime import date
+from types import MappingProxyType
 from typing import Dict, List, Optional
-import time
 import os
+import threading
+import time
+import pandas as pd
 from dotenv import load_dotenv
 load_dotenv()
 
+# Platform credentials, read once at import time
+CEDROTECH_USER = os.getenv("CEDROTECH_PLATFORM", "")
+CEDROTECH_PASS = os.getenv("CEDROTECH_PLAT_PASSWORD", "")
+
+logger = logging.getLogger(__name__)
+
+# Fields that mark a companyQuotes entry as a full quote (no per-symbol request needed)
+QUOTE_FIELDS = ('bid', 'ask', 'lastTrade', 'volumeAmount')
+
+# Static companyQuotes filters: types=2 (options), markets=1 (Bovespa)
+_OPTIONS_BASE = MappingProxyType({"types": "2", "markets": "1"})
+
+# Option direction codes used by the summary instead of repeated string checks
+DIRECTION_CALL, DIRECTION_PUT, DIRECTION_UNKNOWN = 0, 1, 2
+
+# Fields that are all empty/zero for an option that has never traded
+ACTIVITY_FIELDS = ('lastTrade', 'bid', 'ask', 'theoryPrice', 'volumeAmount')
+
+# Option chains only change on listing/expiry events, so they are cached on disk
+# per (company, day). Chains that embed live quotes are only reused for QUOTE_CACHE_TTL.
+OPTIONS_CACHE_FILE = 'options_chain_cache.json'
+QUOTE_CACHE_TTL = 60  # seconds
+
+def _direction_code(direction) -> int:
+    """Normalize an option direction string once into a small integer code"""
+    direction = str(direction or '').lower()
+    if 'call' in direction:
+        return DIRECTION_CALL
+    if 'put' in direction:
+        return DIRECTION_PUT
+    return DIRECTION_UNKNOWN
+
+def _safe_float(value, default=0.0):
+    """Safely convert an API field to float"""
+    try:
+        if value is None or value == '':
+            return default
+        return float(value)
+    except (ValueError, TypeError):
+        return default
+
+def _safe_int(value, default=0):
+    """Safely convert an API field to int"""
+    try:
+        if value is None or value == '':
+            return default
+        return int(float(value))  # Convert through float first to handle string decimals
+    except (ValueError, TypeError):
+        return default
+
+@dataclass(slots=True)
+class OptionAnalysis:
+    """Key trading information extracted from a single option quote"""
+    symbol: str
+    underlying: str
+    type: str
+    direction: str
+    last_trade: float
+    bid: float
+    ask: float
+    theory_price: float
+    volume: int
+    open_interest: int
+    contract_multiplier: int
+    change: float
+    change_percent: float
+    high: float
+    low: float
+    market_cap: float
+    spread: float
+    spread_percent: float
+    is_liquid: bool
+    has_value: bool
+    direction_code: int  # DIRECTION_CALL / DIRECTION_PUT / DIRECTION_UNKNOWN
+
 class CedroTechOptionsDiscovery:
     """Automated options discovery and analysis system"""
     
@@ -20,7 +105,27 @@ class CedroTechOptionsDiscovery:
         self.password = password
         self.base_url = "https://webfeeder.cedrotech.com"
         self.session = requests.Session()
+        
+        # Pool sized above the detail-fetch worker count so parallel requests
+        # reuse connections, plus retries for transient rate-limit/server errors.
+        # pool_block makes a burst wait for a warm connection instead of opening
+        # throwaway ones that get discarded once the pool is full
+        adapter = HTTPAdapter(
+            pool_connections=16,
+            pool_maxsize=32,
+            pool_block=True,
+            max_retries=Retry(
+                total=3,
+                backoff_factor=0.3,
+                status_forcelist=(429, 500, 502, 503, 504),
+                allowed_methods=frozenset(["GET", "POST"]),
+                raise_on_status=False
+            )
+        )
+        self.session.mount("https://", adapter)
+        self.session.headers.update({"accept": "application/json"})
         self.authenticated = False
+        self._cache_lock = threading.Lock()
         
     def authenticate(self) -> bool:
         """Authenticate with CedroTech API"""
@@ -31,9 +136,8 @@ class CedroTechOptionsDiscovery:
             "login": self.username,
             "password": self.password
         }
-        auth_headers = {"accept": "application/json"}
         
-        response = self.session.post(auth_url, headers=auth_headers, params=auth_params)
+        response = self.session.post(auth_url, params=auth_params)
         
         if response.status_code == 200:
             print("   ✅ Authentication successful!")
@@ -43,39 +147,70 @@ class CedroTechOptionsDiscovery:
             print(f"   ❌ Authentication failed: {response.status_code}")
             return False
     
-    def get_company_options(self, company: str) -> List[str]:
+    def _load_options_cache(self) -> Dict:
+        """Load the on-disk option chain cache"""
+        try:
+            with open(OPTIONS_CACHE_FILE, 'rb') as f:
+                return orjson.loads(f.read())
+        except (OSError, json.JSONDecodeError):
+            return {}
+    
+    def _save_options_cache(self, company: str, options: List) -> None:
+        """Store today's option chain for a company, dropping entries from previous days"""
+        today = date.today().isoformat()
+        # Companies are processed concurrently - serialize the read-modify-write
+        with self._cache_lock:
+            cache = {key: value for key, value in self._load_options_cache().items() if key.endswith(today)}
+            cache[f"{company}:{today}"] = {'fetched_at': time.time(), 'options': options}
+            try:
+                # Single buffered write to a temp file, then swap it in so concurrent
+                # readers never see a half-written cache
+                tmp_file = f"{OPTIONS_CACHE_FILE}.tmp"
+                with open(tmp_file, 'wb') as f:
+                    f.write(orjson.dumps(cache))
+                os.replace(tmp_file, OPTIONS_CACHE_FILE)
+            except OSError as e:
+                logger.warning("   ⚠️  Failed to write options cache: %s", e)
+    
+    def get_company_options(self, company: str, use_cache: bool = True) -> List[str]:
         """Get all options symbols for a specific company"""
         if not self.authenticated:
-            print("❌ Not authenticated!")
+            logger.error("❌ Not authenticated!")
             return []
         
-        print(f"📊 Getting options for {company}...")
+        if use_cache:
+            cached = self._load_options_cache().get(f"{company}:{date.today().isoformat()}")
+            if cached:
+                options = cached['options']
+                age = time.time() - cached['fetched_at']
+                if not any(self._has_quote_fields(entry) for entry in options[:1]) or age < QUOTE_CACHE_TTL:
+                    logger.info("📊 Using cached options for %s (%d options)", company, len(options))
+                    return options
+        
+        logger.info("📊 Getting options for %s...", company)
         
         # Company quotes endpoint for options
         company_url = f"{self.base_url}/services/quotes/companyQuotes"
-        params = {
-            "company": company,
-            "types": "2",  # Options
-            "markets": "1"  # Bovespa
-        }
-        headers = {"accept": "application/json"}
+        params = {"company": company, **_OPTIONS_BASE}
         
-        response = self.session.get(company_url, headers=headers, params=params)
+        response = self.session.get(company_url, params=params)
         
         if response.status_code == 200:
             try:
-                data = response.json()
+                data = orjson.loads(response.content)
                 if isinstance(data, list):
-                    print(f"   ✅ Found {len(data)} options for {company}")
+                    logger.info("   ✅ Found %d options for %s", len(data), company)
+                    if use_cache:
+                        self._save_options_cache(company, data)
                     return data
                 else:
-                    print(f"   ⚠️  Unexpected response format: {type(data)}")
+                    logger.warning("   ⚠️  Unexpected response format: %s", type(data))
                     return []
             except json.JSONDecodeError:
-                print(f"   ❌ Failed to parse JSON response")
+                logger.error("   ❌ Failed to parse JSON response")
                 return []
         else:
-            print(f"   ❌ Failed to get options: {response.status_code}")
+            logger.error("   ❌ Failed to get options: %s", response.status_code)
             return []
     
     def get_option_details(self, symbol: str) -> Optional[Dict]:
@@ -85,74 +220,189 @@ class CedroTechOptionsDiscovery:
         
         # Use regular quote endpoint for individual option
         quote_url = f"{self.base_url}/services/quotes/quote/{symbol}"
-        headers = {"accept": "application/json"}
         
-        response = self.session.get(quote_url, headers=headers)
+        response = self.session.get(quote_url)
         
         if response.status_code == 200:
             try:
-                return response.json()
+                return orjson.loads(response.content)
             except json.JSONDecodeError:
                 return None
         return None
     
-    def analyze_option(self, option_data: Dict) -> Dict:
+    @staticmethod
+    def _has_quote_fields(entry) -> bool:
+        """Check whether a companyQuotes entry already carries the quote data analyze_option needs"""
+        return isinstance(entry, dict) and any(field in entry for field in QUOTE_FIELDS)
+    
+    @staticmethod
+    def _option_symbol(entry) -> str:
+        """Extract the option symbol from a companyQuotes entry (plain string or dict)"""
+        if isinstance(entry, dict):
+            return entry.get('symbol', '')
+        return entry
+    
+    def analyze_option(self, option_data: Dict) -> OptionAnalysis:
         """Analyze option data and extract key trading information"""
+        # Untraded/delisted contracts carry no prices or volume - skip the full conversion
+        if not any(option_data.get(field) for field in ACTIVITY_FIELDS):
+            return OptionAnalysis(
+                symbol=option_data.get('symbol', 'N/A'),
+                underlying=option_data.get('parentSymbol', 'N/A'),
+                type=option_data.get('typeOption', 'N/A'),
+                direction=option_data.get('directionOption', 'N/A'),
+                last_trade=0.0,
+                bid=0.0,
+                ask=0.0,
+                theory_price=0.0,
+                volume=0,
+                open_interest=_safe_int(option_data.get('interest', 0)),
+                contract_multiplier=_safe_int(option_data.get('contractMultiplier', 1)),
+                change=0.0,
+                change_percent=0.0,
+                high=0.0,
+                low=0.0,
+                market_cap=0.0,
+                spread=0,
+                spread_percent=0,
+                is_liquid=False,
+                has_value=False,
+                direction_code=_direction_code(option_data.get('directionOption'))
+            )
         
-        # Helper function to safely convert to float
-        def safe_float(value, default=0.0):
-            try:
-                if value is None or value == '':
-                    return default
-                return float(value)
-            except (ValueError, TypeError):
-                return default
-        
-        # Helper function to safely convert to int
-        def safe_int(value, default=0):
-            try:
-                if value is None or value == '':
-                    return default
-                return int(float(value))  # Convert through float first to handle string decimals
-            except (ValueError, TypeError):
-                return default
-        
-        analysis = {
-            'symbol': option_data.get('symbol', 'N/A'),
-            'underlying': option_data.get('parentSymbol', 'N/A'),
-            'type': option_data.get('typeOption', 'N/A'),
-            'direction': option_data.get('directionOption', 'N/A'),
-            'last_trade': safe_float(option_data.get('lastTrade', 0)),
-            'bid': safe_float(option_data.get('bid', 0)),
-            'ask': safe_float(option_data.get('ask', 0)),
-            'theory_price': safe_float(option_data.get('theoryPrice', 0)),
-            'volume': safe_int(option_data.get('volumeAmount', 0)),
-            'open_interest': safe_int(option_data.get('interest', 0)),
-            'contract_multiplier': safe_int(option_data.get('contractMultiplier', 1)),
-            'change': safe_float(option_data.get('change', 0)),
-            'change_percent': safe_float(option_data.get('changeWeek', 0)),
-            'high': safe_float(option_data.get('high', 0)),
-            'low': safe_float(option_data.get('low', 0)),
-            'market_cap': safe_float(option_data.get('marketCap', 0))
-        }
+        last_trade = _safe_float(option_data.get('lastTrade', 0))
+        bid = _safe_float(option_data.get('bid', 0))
+        ask = _safe_float(option_data.get('ask', 0))
+        theory_price = _safe_float(option_data.get('theoryPrice', 0))
+        volume = _safe_int(option_data.get('volumeAmount', 0))
         
         # Calculate spread
-        if analysis['bid'] > 0 and analysis['ask'] > 0:
-            analysis['spread'] = analysis['ask'] - analysis['bid']
-            analysis['spread_percent'] = (analysis['spread'] / analysis['ask']) * 100 if analysis['ask'] > 0 else 0
+        if bid > 0 and ask > 0:
+            spread = ask - bid
+            spread_percent = (spread / ask) * 100
         else:
-            analysis['spread'] = 0
-            analysis['spread_percent'] = 0
+            spread = 0
+            spread_percent = 0
+        
+        return OptionAnalysis(
+            symbol=option_data.get('symbol', 'N/A'),
+            underlying=option_data.get('parentSymbol', 'N/A'),
+            type=option_data.get('typeOption', 'N/A'),
+            direction=option_data.get('directionOption', 'N/A'),
+            last_trade=last_trade,
+            bid=bid,
+            ask=ask,
+            theory_price=theory_price,
+            volume=volume,
+            open_interest=_safe_int(option_data.get('interest', 0)),
+            contract_multiplier=_safe_int(option_data.get('contractMultiplier', 1)),
+            change=_safe_float(option_data.get('change', 0)),
+            change_percent=_safe_float(option_data.get('changeWeek', 0)),
+            high=_safe_float(option_data.get('high', 0)),
+            low=_safe_float(option_data.get('low', 0)),
+            market_cap=_safe_float(option_data.get('marketCap', 0)),
+            spread=spread,
+            spread_percent=spread_percent,
+            # Determine if option is liquid (has meaningful bid/ask)
+            is_liquid=bid > 0 and ask > 0 and volume > 0,
+            # Calculate moneyness indicator (simplified)
+            has_value=last_trade > 0 or theory_price > 0,
+            direction_code=_direction_code(option_data.get('directionOption'))
+        )
+    
+    def _summarize_options(self, options: List[OptionAnalysis]) -> Dict:
+        """Compute company summary statistics over all analyzed options at once"""
+        summary = {
+            'liquid_options': 0,
+            'call_options': 0,
+            'put_options': 0,
+            'avg_spread': 0,
+            'total_volume': 0
+        }
+        if not options:
+            return summary
+        
+        df = pd.DataFrame({
+            'direction_code': [opt.direction_code for opt in options],
+            'volume': [opt.volume for opt in options],
+            'spread': [opt.spread for opt in options],
+            'is_liquid': [opt.is_liquid for opt in options]
+        })
+        direction_counts = df['direction_code'].value_counts()
+        
+        summary['liquid_options'] = int(df['is_liquid'].sum())
+        summary['call_options'] = int(direction_counts.get(DIRECTION_CALL, 0))
+        summary['put_options'] = int(direction_counts.get(DIRECTION_PUT, 0))
+        summary['total_volume'] = int(df['volume'].sum())
+        
+        # Average spread over liquid options
+        if summary['liquid_options'] > 0:
+            summary['avg_spread'] = float(df.loc[df['spread'] > 0, 'spread'].sum()) / summary['liquid_options']
+        
+        return summary
+    
+    def _process_company(self, company: str, executor: ThreadPoolExecutor,
+                         max_options_per_company: int) -> Optional[Dict]:
+        """Fetch and analyze the option chain of a single company"""
+        logger.info("🏢 Processing %s...", company)
+        
+        # Get option symbols for this company
+        option_symbols = self.get_company_options(company)
+        
+        if not option_symbols:
+            logger.warning("   ⚠️  No options found for %s", company)
+            return None
+        
+        # Limit options to analyze (avoid overwhelming the API)
+        symbols_to_analyze = option_symbols[:max_options_per_company]
+        
+        company_results = {
+            'total_options': len(option_symbols),
+            'analyzed_options': len(symbols_to_analyze),
+            'options': [],
+            'summary': {}
+        }
         
-        # Determine if option is liquid (has meaningful bid/ask)
-        analysis['is_liquid'] = analysis['bid'] > 0 and analysis['ask'] > 0 and analysis['volume'] > 0
+        logger.info("   📊 Analyzing %d options...", len(symbols_to_analyze))
         
-        # Calculate moneyness indicator (simplified)
-        analysis['has_value'] = analysis['last_trade'] > 0 or analysis['theory_price'] > 0
+        # companyQuotes entries that already carry quote fields are analyzed as-is;
+        # only bare symbols (or entries missing quote data) need a quote request
+        option_details_list = [
+            entry if self._has_quote_fields(entry) else None
+            for entry in symbols_to_analyze
+        ]
+        pending = [index for index, details in enumerate(option_details_list) if details is None]
+        if len(pending) < len(symbols_to_analyze):
+            logger.info("   ⚡ %d options already quoted by companyQuotes", len(symbols_to_analyze) - len(pending))
         
-        return analysis
+        # Fetch the remaining option details on the shared pool - the session keeps
+        # connections alive and the pool size bounds how many requests hit the API at once
+        progress_enabled = logger.isEnabledFor(logging.INFO)
+        futures = {executor.submit(self.get_option_details, self._option_symbol(symbols_to_analyze[index])): index
+                   for index in pending}
+        for i, future in enumerate(as_completed(futures), start=1):
+            if i % 10 == 0 and progress_enabled:
+                logger.info("   🔄 Processed %d options...", i)
+            index = futures[future]
+            try:
+                option_details_list[index] = future.result()
+            except requests.RequestException as e:
+                logger.warning("   ⚠️  Failed to fetch %s: %s", self._option_symbol(symbols_to_analyze[index]), e)
+        
+        # Analyze once all fetches are in, keeping the original symbol order
+        company_results['options'] = [
+            self.analyze_option(option_details)
+            for option_details in option_details_list if option_details
+        ]
+        company_results['summary'] = self._summarize_options(company_results['options'])
+        
+        logger.info("   ✅ Completed %s: %d liquid options found", company,
+                    company_results['summary']['liquid_options'])
+        
+        return company_results
     
-    def discover_and_analyze_options(self, companies: List[str], max_options_per_company: int = 50) -> Dict:
+    def discover_and_analyze_options(self, companies: List[str], max_options_per_company: int = 50,
+                                     max_workers: int = 8) -> Dict:
         """Discover and analyze options for multiple companies"""
         print("🚀 Starting Automated Options Discovery...")
         print("=" * 60)
@@ -162,69 +412,19 @@ class CedroTechOptionsDiscovery:
         
         all_results = {}
         
-        for company in companies:
-            print(f"\n🏢 Processing {company}...")
-            
-            # Get option symbols for this company
-            option_symbols = self.get_company_options(company)
-            
-            if not option_symbols:
-                print(f"   ⚠️  No options found for {company}")
-                continue
-            
-            # Limit options to analyze (avoid overwhelming the API)
-            symbols_to_analyze = option_symbols[:max_options_per_company]
-            
-            company_results = {
-                'total_options': len(option_symbols),
-                'analyzed_options': len(symbols_to_analyze),
-                'options': [],
-                'summary': {
-                    'liquid_options': 0,
-                    'call_options': 0,
-                    'put_options': 0,
-                    'avg_spread': 0,
-                    'total_volume': 0
-                }
-            }
-            
-            print(f"   📊 Analyzing {len(symbols_to_analyze)} options...")
-            
-            for i, symbol in enumerate(symbols_to_analyze):
-                # Rate limiting - don't overwhelm the API
-                if i > 0 and i % 10 == 0:
-                    print(f"   🔄 Processed {i} options...")
-                    time.sleep(0.5)  # Brief pause
-                
-                option_details = self.get_option_details(symbol)
-                
-                if option_details:
-                    analysis = self.analyze_option(option_details)
-                    company_results['options'].append(analysis)
-                    
-                    # Update summary statistics
-                    summary = company_results['summary']
-                    if analysis['is_liquid']:
-                        summary['liquid_options'] += 1
-                    
-                    if analysis['direction'] and 'call' in analysis['direction'].lower():
-                        summary['call_options'] += 1
-                    elif analysis['direction'] and 'put' in analysis['direction'].lower():
-                        summary['put_options'] += 1
-                    
-                    summary['total_volume'] += analysis['volume']
-                    
-                    if analysis['spread'] > 0:
-                        summary['avg_spread'] += analysis['spread']
-            
-            # Calculate average spread
-            liquid_count = company_results['summary']['liquid_options']
-            if liquid_count > 0:
-                company_results['summary']['avg_spread'] /= liquid_count
-            
-            all_results[company] = company_results
-            
-            print(f"   ✅ Completed {company}: {liquid_count} liquid options found")
+        # Companies are independent, so they are processed concurrently. Their option
+        # detail fetches all go through one shared pool, which caps the global number
+        # of in-flight quote requests regardless of how many companies are running
+        with ThreadPoolExecutor(max_workers=max_workers) as executor, \
+                ThreadPoolExecutor(max_workers=max(len(companies), 1)) as company_executor:
+            company_futures = [
+                company_executor.submit(self._process_company, company, executor, max_options_per_company)
+                for company in companies
+            ]
+            for company, future in zip(companies, company_futures):
+                company_results = future.result()
+                if company_results is not None:
+                    all_results[company] = company_results
         
         return all_results
     
@@ -256,13 +456,13 @@ class CedroTechOptionsDiscovery:
             print(f"  📦 Total Volume: {summary['total_volume']}")
             
             # Show top 3 most liquid options
-            liquid_options = [opt for opt in data['options'] if opt['is_liquid']]
+            liquid_options = [opt for opt in data['options'] if opt.is_liquid]
             if liquid_options:
                 # Sort by volume
-                liquid_options.sort(key=lambda x: x['volume'], reverse=True)
+                liquid_options.sort(key=lambda x: x.volume, reverse=True)
                 print(f"  🎯 Top liquid options:")
                 for opt in liquid_options[:3]:
-                    print(f"    • {opt['symbol']}: Vol={opt['volume']}, Spread=R${opt['spread']:.4f}")
+                    print(f"    • {opt.symbol}: Vol={opt.volume}, Spread=R${opt.spread:.4f}")
             print()
         
         print(f"\n💡 Integration Recommendations:")
@@ -284,15 +484,13 @@ class CedroTechOptionsDiscovery:
 
 def main():
     """Main function to run automated options discovery"""
-    # Platform credentials that work
-    username = os.getenv("CEDROTECH_PLATFORM", "")
-    password = os.getenv("CEDROTECH_PLAT_PASSWORD", "")
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
     
     # Companies to analyze
     companies = ["VALE", "PETROBRAS", "BRADESCO", "ITAU", "AMBEV"]
     
     # Initialize discovery system
-    options_discovery = CedroTechOptionsDiscovery(username, password)
+    options_discovery = CedroTechOptionsDiscovery(CEDROTECH_USER, CEDROTECH_PASS)
     
     # Run comprehensive analysis
     results = options_discovery.discover_and_analyze_options(companies, max_options_per_company=30)
@@ -301,8 +499,8 @@ def main():
     options_discovery.print_results_summary(results)
     
     # Save results to file for later use
-    with open('options_discovery_results.json', 'w') as f:
-        json.dump(results, f, indent=2)
+    with open('options_discovery_results.json', 'wb') as f:
+        f.write(orjson.dumps(results, option=orjson.OPT_INDENT_2))
     
     print(f"\n💾 Results saved to 'options_discovery_results.json'")
     print(f"🎯 Ready for options trading integration!")
@@ -5,53 +5,113 @@ Discover available forex and currency instruments through CedroTech API
 To potentially avoid monthly fees by maintaining forex contracts
 """
 
-import requests
-import json
+import logging
+import orjson
 import os
+import re
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from typing import Dict, List, Any, Optional
 from dotenv import load_dotenv
+from utils.cedrotech_http import RateLimiter, get_shared_session, restore_session_cookies, save_session_cookies, clear_session_cookies
 
 load_dotenv()
 
+log = logging.getLogger(__name__)
+
+# Forex-related keywords looked up in (uppercased) market names/descriptions
+FOREX_KEYWORDS = frozenset({'FOREX', 'CURRENCY', 'CAMBIO', 'DOLAR', 'DOLLAR', 'MOEDA', 'FX'})
+_FOREX_RE = re.compile("|".join(sorted(FOREX_KEYWORDS)))
+
+# Per-symbol endpoint pieces, joined onto base_url once per instance
+_QUOTE_PATH = "/services/quotes/quote/"
+_CQ_PATH = "/services/quotes/companyQuotes?company="
+_CQ_SUFFIX = "&types=2&markets=1"
+
+# Symbols the server reported as unknown, skipped by later runs until the entry expires
+NEGATIVE_CACHE_FILE = os.path.expanduser("~/.cedrotech_forex_misses.json")
+NEGATIVE_CACHE_TTL = 3600  # seconds
+
+# Common forex symbols to test
+FOREX_SYMBOLS = (
+    'USD', 'USDBRL', 'USD/BRL', 'DOLBRL', 'DOL',
+    'EUR', 'EURBRL', 'EUR/BRL', 'EURBR', 
+    'GBP', 'GBPBRL', 'GBP/BRL',
+    'JPY', 'JPYBRL', 'JPY/BRL',
+    'CHF', 'CHFBRL', 'CHF/BRL',
+    'CAD', 'CADBRL', 'CAD/BRL',
+    'AUD', 'AUDBRL', 'AUD/BRL',
+    'WINFUT', 'WINJ25', 'WINZ24',  # Mini Dollar futures
+    'DOLFUT', 'DOLJ25', 'DOLZ24',  # Full Dollar futures
+    'EURF', 'EURJ25', 'EURZ24',    # Euro futures
+)
+
+# BM&F futures symbols checked for currency contracts
+BMF_SYMBOLS = (
+    'WDO', 'WDO25', 'WDO24',  # Mini Dollar
+    'DOL', 'DOL25', 'DOL24',  # Full Dollar
+    'IND', 'IND25', 'IND24',  # Ibovespa
+    'WIN', 'WIN25', 'WIN24',  # Mini Ibovespa  
+    'EUR', 'EUR25', 'EUR24',  # Euro
+    'WINx25', 'WINz24', 'WINj25',  # Win specific months
+    'WDOx25', 'WDOz24', 'WDOj25',  # Mini Dollar specific months
+)
+
+def _field_suffix(data: Any, key: str, label: str) -> str:
+    """Format ' (label: value)' for a truthy field of a decoded quote, or '' when absent"""
+    # Decoded JSON is never a dict subclass, so an exact type check is enough
+    if type(data) is dict:
+        value = data.get(key)
+        if value:
+            return f" ({label}: {value})"
+    return ""
+
 class CedroTechForexDiscovery:
     """
     Discover forex/currency trading options available through CedroTech API
     """
     
-    def __init__(self):
+    def __init__(self, max_workers: int = 8, verbose: bool = False, max_rate: float = 10):
         self.base_url = "https://webfeeder.cedrotech.com"
-        self.session = requests.Session()
+        self._quote_prefix = self.base_url + _QUOTE_PATH
+        self._cq_prefix = self.base_url + _CQ_PATH
+        self.verbose = verbose
+        # Per-symbol probe details: INFO for a verbose instance, DEBUG otherwise
+        # (per instance - the module logger's level is left alone)
+        self._detail_level = logging.INFO if verbose else logging.DEBUG
+        self.max_workers = max_workers  # concurrent symbol probes
+        self._limiter = RateLimiter(max_rate)  # probe requests per second across all workers
+        self.session = get_shared_session()
         self.authenticated = False
         
+        # Probes run in parallel: a rejected session is replaced by one SignIn, not one per worker
+        self._auth_lock = threading.Lock()
+        self._auth_generation = 0
+        
         # Get credentials
         self.platform_user = os.getenv('CEDROTECH_PLATAFORM')
         self.platform_password = os.getenv('CEDROTECH_PLAT_PASSWORD')
         
-        # Common forex symbols to test
-        self.forex_symbols = [
-            'USD', 'USDBRL', 'USD/BRL', 'DOLBRL', 'DOL',
-            'EUR', 'EURBRL', 'EUR/BRL', 'EURBR', 
-            'GBP', 'GBPBRL', 'GBP/BRL',
-            'JPY', 'JPYBRL', 'JPY/BRL',
-            'CHF', 'CHFBRL', 'CHF/BRL',
-            'CAD', 'CADBRL', 'CAD/BRL',
-            'AUD', 'AUDBRL', 'AUD/BRL',
-            'WINFUT', 'WINJ25', 'WINZ24',  # Mini Dollar futures
-            'DOLFUT', 'DOLJ25', 'DOLZ24',  # Full Dollar futures
-            'EURF', 'EURJ25', 'EURZ24',    # Euro futures
-        ]
+        self.forex_symbols = FOREX_SYMBOLS
         
         # Set headers
         self.session.headers.update({
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
             'Accept': 'application/json, text/plain, */*',
             'Accept-Language': 'pt-BR,pt;q=0.9,en;q=0.8',
+            'Accept-Encoding': 'gzip, deflate',  # compressed listMarket payloads; urllib3 decodes transparently
             'Connection': 'keep-alive'
         })
         
         self.results = {}
+        
+        # symbol -> quote (or None) for this run; FOREX_SYMBOLS and BMF_SYMBOLS overlap
+        self._quotes = {}
+        
+        # symbol -> wall-clock expiry of a "not found" answer; persisted between runs
+        self._dead_symbols = {}
     
     def authenticate(self) -> bool:
         """Authenticate with CedroTech platform"""
@@ -61,6 +121,12 @@ class CedroTechForexDiscovery:
             print("❌ Missing credentials! Check environment variables")
             return False
         
+        # Reuse cookies from a recent run instead of another SignIn round-trip
+        if restore_session_cookies(self.session, self.platform_user, self.base_url):
+            print("✅ Reusing saved session cookies")
+            self.authenticated = True
+            return True
+        
         try:
             auth_url = f"{self.base_url}/SignIn"
             params = {
@@ -73,6 +139,7 @@ class CedroTechForexDiscovery:
             if response.status_code == 200 and dict(self.session.cookies):
                 print("✅ Authentication successful!")
                 self.authenticated = True
+                save_session_cookies(self.session, self.platform_user)
                 return True
             else:
                 print(f"❌ Authentication failed: {response.status_code}")
@@ -95,20 +162,17 @@ class CedroTechForexDiscovery:
             response = self.session.get(url, timeout=10)
             
             if response.status_code == 200:
-                markets = response.json()
-                print(f"✅ Found {len(markets) if isinstance(markets, list) else 'unknown'} markets")
+                markets = orjson.loads(response.content)
+                print(f"✅ Found {len(markets) if type(markets) is list else 'unknown'} markets")
                 
                 # Look for forex/currency related markets
                 forex_markets = []
-                if isinstance(markets, list):
+                if type(markets) is list:
                     for market in markets:
-                        if isinstance(market, dict):
-                            name = str(market.get('name', '')).upper()
-                            description = str(market.get('description', '')).upper()
-                            
-                            # Check for forex-related keywords
-                            forex_keywords = ['FOREX', 'CURRENCY', 'CAMBIO', 'DOLAR', 'DOLLAR', 'MOEDA', 'FX']
-                            if any(keyword in name or keyword in description for keyword in forex_keywords):
+                        if type(market) is dict:
+                            # Check name and description for forex-related keywords in one scan
+                            text = f"{market.get('name', '')} {market.get('description', '')}".upper()
+                            if _FOREX_RE.search(text):
                                 forex_markets.append(market)
                                 print(f"🏦 FOREX MARKET FOUND: {market}")
                 
@@ -129,6 +193,123 @@ class CedroTechForexDiscovery:
             print(f"❌ Error discovering markets: {e}")
             return []
     
+    def _probe_quote(self, symbol: str) -> Optional[Any]:
+        """Fetch a quote for a symbol, returning None when it is not available"""
+        # Symbols shared between the forex and BM&F lists are only fetched once per run
+        if symbol in self._quotes:
+            return self._quotes[symbol]
+        
+        # Known-missing symbols from a recent run are not asked for again
+        if self._dead_symbols.get(symbol, 0) > time.time():
+            return None
+        
+        url = self._quote_prefix + symbol
+        generation = self._auth_generation
+        self._limiter.acquire()
+        response = self.session.get(url, timeout=5)
+        
+        if response.status_code == 401 and self._reauthenticate(generation):
+            self._limiter.acquire()
+            response = self.session.get(url, timeout=5)
+        
+        data = None
+        not_found = response.status_code == 404
+        if response.status_code == 200:
+            data = orjson.loads(response.content)
+            if not data or (type(data) is dict and data.get('error')):
+                data = None
+                not_found = True
+        
+        # Auth, rate-limit and server errors are transient; only a definite "not found" is remembered across runs
+        if not_found:
+            self._dead_symbols[symbol] = time.time() + NEGATIVE_CACHE_TTL
+        
+        self._quotes[symbol] = data
+        return data
+    
+    def _reauthenticate(self, generation: int) -> bool:
+        """
+        Replace session cookies the server rejected with a 401
+        
+        Args:
+            generation: Value of _auth_generation when the rejected request was sent
+            
+        Returns:
+            bool: True if the session was renewed (here or by another probe) and the request can be retried
+        """
+        with self._auth_lock:
+            if self._auth_generation != generation:
+                # Another worker already signed in again after the same 401
+                return self.authenticated
+            
+            # Saved cookies expired server-side - force a fresh SignIn instead of restoring them
+            clear_session_cookies(self.session, self.platform_user)
+            self.authenticated = False
+            self._auth_generation += 1
+            return self.authenticate()
+    
+    def _load_dead_symbols(self) -> Dict[str, float]:
+        """Load unexpired negative probe results saved by a previous run"""
+        try:
+            with open(NEGATIVE_CACHE_FILE, 'rb') as f:
+                saved = orjson.loads(f.read())
+        except (OSError, orjson.JSONDecodeError):
+            return {}
+        
+        now = time.time()
+        return {symbol: expires for symbol, expires in saved.items() if expires > now} if type(saved) is dict else {}
+    
+    def _save_dead_symbols(self):
+        """Persist unexpired negative probe results for the next run"""
+        now = time.time()
+        alive = {symbol: expires for symbol, expires in self._dead_symbols.items() if expires > now}
+        try:
+            with open(NEGATIVE_CACHE_FILE, 'wb') as f:
+                f.write(orjson.dumps(alive))
+        except OSError as e:
+            log.warning("⚠️ Could not save negative symbol cache: %s", e)
+    
+    def _probe_forex_symbol(self, symbol: str) -> Dict[str, Any]:
+        """Probe quote and company quotes endpoints for a single forex symbol"""
+        found = {}
+        
+        # Test quote endpoint
+        data = self._probe_quote(symbol)
+        if data is None:
+            # No quote means no listed underlying, so there are no derivatives to look up either
+            return found
+        
+        found.update({
+            'type': 'quote',
+            'data': data,
+            'url': self._quote_prefix + symbol
+        })
+        
+        # Test company quotes (for options/derivatives)
+        url2 = self._cq_prefix + symbol + _CQ_SUFFIX
+        self._limiter.acquire()
+        response2 = self.session.get(url2, timeout=5)
+        
+        if response2.status_code == 200:
+            data2 = orjson.loads(response2.content)
+            if data2 and type(data2) is list and len(data2) > 0:
+                found['derivatives'] = data2
+        
+        return found
+    
+    def _probe_all(self, probe, symbols: List[str]) -> List[tuple]:
+        """Run a probe over all symbols concurrently, returning (symbol, result, error) in order"""
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = [executor.submit(probe, symbol) for symbol in symbols]
+        
+        results = []
+        for symbol, future in zip(symbols, futures):
+            try:
+                results.append((symbol, future.result(), None))
+            except Exception as e:
+                results.append((symbol, None, e))
+        return results
+    
     def test_forex_symbols(self) -> Dict[str, Any]:
         """Test various forex symbols to see what's available"""
         print("\n💱 TESTING FOREX SYMBOLS...")
@@ -139,46 +320,26 @@ class CedroTechForexDiscovery:
         
         found_symbols = {}
         
-        for symbol in self.forex_symbols:
-            print(f"   Testing: {symbol}")
+        for symbol, found, error in self._probe_all(self._probe_forex_symbol, self.forex_symbols):
+            log.log(self._detail_level, "   Testing: %s", symbol)
             
-            try:
-                # Test quote endpoint
-                url = f"{self.base_url}/services/quotes/quote/{symbol}"
-                response = self.session.get(url, timeout=5)
-                
-                if response.status_code == 200:
-                    data = response.json()
-                    if data and not (isinstance(data, dict) and data.get('error')):
-                        found_symbols[symbol] = {
-                            'type': 'quote',
-                            'data': data,
-                            'url': url
-                        }
-                        print(f"   ✅ {symbol}: FOUND in quotes!")
-                        
-                        # If it's a quote, get more details
-                        if isinstance(data, dict):
-                            print(f"      Price: {data.get('price', 'N/A')}")
-                            print(f"      Name: {data.get('name', 'N/A')}")
-                
-                # Test company quotes (for options/derivatives)
-                url2 = f"{self.base_url}/services/quotes/companyQuotes?company={symbol}&types=2&markets=1"
-                response2 = self.session.get(url2, timeout=5)
-                
-                if response2.status_code == 200:
-                    data2 = response2.json()
-                    if data2 and isinstance(data2, list) and len(data2) > 0:
-                        if symbol not in found_symbols:
-                            found_symbols[symbol] = {}
-                        found_symbols[symbol]['derivatives'] = data2
-                        print(f"   ✅ {symbol}: Found {len(data2)} derivatives/options!")
-                
-                time.sleep(0.2)  # Be respectful to API
-                
-            except Exception as e:
-                print(f"   ❌ {symbol}: Error - {e}")
+            if error:
+                log.warning("   ❌ %s: Error - %s", symbol, error)
                 continue
+            
+            if 'data' in found:
+                log.info("   ✅ %s: FOUND in quotes!", symbol)
+                
+                # If it's a quote, show more details
+                if type(found['data']) is dict:
+                    log.log(self._detail_level, "      Price: %s", found['data'].get('price', 'N/A'))
+                    log.log(self._detail_level, "      Name: %s", found['data'].get('name', 'N/A'))
+            
+            if 'derivatives' in found:
+                log.info("   ✅ %s: Found %d derivatives/options!", symbol, len(found['derivatives']))
+            
+            if found:
+                found_symbols[symbol] = found
         
         self.results['forex_symbols'] = found_symbols
         return found_symbols
@@ -191,39 +352,20 @@ class CedroTechForexDiscovery:
             if not self.authenticate():
                 return {}
         
-        bmf_symbols = [
-            'WDO', 'WDO25', 'WDO24',  # Mini Dollar
-            'DOL', 'DOL25', 'DOL24',  # Full Dollar
-            'IND', 'IND25', 'IND24',  # Ibovespa
-            'WIN', 'WIN25', 'WIN24',  # Mini Ibovespa  
-            'EUR', 'EUR25', 'EUR24',  # Euro
-            'WINx25', 'WINz24', 'WINj25',  # Win specific months
-            'WDOx25', 'WDOz24', 'WDOj25',  # Mini Dollar specific months
-        ]
-        
         futures_found = {}
         
-        for symbol in bmf_symbols:
-            print(f"   Testing BM&F: {symbol}")
+        for symbol, data, error in self._probe_all(self._probe_quote, BMF_SYMBOLS):
+            log.log(self._detail_level, "   Testing BM&F: %s", symbol)
             
-            try:
-                url = f"{self.base_url}/services/quotes/quote/{symbol}"
-                response = self.session.get(url, timeout=5)
-                
-                if response.status_code == 200:
-                    data = response.json()
-                    if data and not (isinstance(data, dict) and data.get('error')):
-                        futures_found[symbol] = data
-                        print(f"   ✅ {symbol}: FOUND!")
-                        
-                        if isinstance(data, dict):
-                            print(f"      Price: {data.get('price', 'N/A')}")
-                            print(f"      Volume: {data.get('volume', 'N/A')}")
-                
-                time.sleep(0.2)
-                
-            except Exception as e:
+            if error or data is None:
                 continue
+            
+            futures_found[symbol] = data
+            log.info("   ✅ %s: FOUND!", symbol)
+            
+            if type(data) is dict:
+                log.log(self._detail_level, "      Price: %s", data.get('price', 'N/A'))
+                log.log(self._detail_level, "      Volume: %s", data.get('volume', 'N/A'))
         
         self.results['bmf_futures'] = futures_found
         return futures_found
@@ -236,6 +378,9 @@ class CedroTechForexDiscovery:
         print("💰 Benefit: Avoid CedroTech monthly fees with BTG Pactual")
         print("=" * 60)
         
+        self._quotes.clear()
+        self._dead_symbols = self._load_dead_symbols()
+        
         # Step 1: Authenticate
         if not self.authenticate():
             print("❌ Cannot proceed without authentication")
@@ -249,6 +394,7 @@ class CedroTechForexDiscovery:
         
         # Step 4: Check BM&F futures
         bmf_futures = self.check_bmf_futures()
+        self._save_dead_symbols()
         
         # Step 5: Generate summary
         self.generate_summary()
@@ -256,109 +402,110 @@ class CedroTechForexDiscovery:
     
     def generate_summary(self):
         """Generate comprehensive summary"""
-        print("\n" + "="*60)
-        print("📊 FOREX DISCOVERY SUMMARY")
-        print("="*60)
-        
         forex_symbols = self.results.get('forex_symbols', {})
         bmf_futures = self.results.get('bmf_futures', {})
         forex_markets = self.results.get('forex_markets', [])
         
-        print(f"🏦 Forex Markets Found: {len(forex_markets)}")
-        print(f"💱 Forex Symbols Found: {len(forex_symbols)}")
-        print(f"🏛️ BM&F Futures Found: {len(bmf_futures)}")
+        lines = [
+            "\n" + "="*60,
+            "📊 FOREX DISCOVERY SUMMARY",
+            "="*60,
+            f"🏦 Forex Markets Found: {len(forex_markets)}",
+            f"💱 Forex Symbols Found: {len(forex_symbols)}",
+            f"🏛️ BM&F Futures Found: {len(bmf_futures)}",
+        ]
         
         if forex_markets:
-            print(f"\n🏦 FOREX MARKETS:")
-            for market in forex_markets:
-                print(f"   🔹 {market.get('name', 'Unknown')} - {market.get('description', 'No description')}")
-        
+            lines.append(f"\n🏦 FOREX MARKETS:")
+            lines.extend(
+                f"   🔹 {market.get('name', 'Unknown')} - {market.get('description', 'No description')}"
+                for market in forex_markets
+            )
+        
+        # Listing and recommendation lines are built in the same pass over each bucket
+        forex_recommendations = []
         if forex_symbols:
-            print(f"\n💱 AVAILABLE FOREX SYMBOLS:")
+            lines.append(f"\n💱 AVAILABLE FOREX SYMBOLS:")
             for symbol, data in forex_symbols.items():
-                price_info = ""
-                if 'data' in data and isinstance(data['data'], dict):
-                    price = data['data'].get('price')
-                    if price:
-                        price_info = f" (Price: {price})"
-                
-                derivatives_info = ""
-                if 'derivatives' in data:
-                    derivatives_info = f" + {len(data['derivatives'])} derivatives"
+                price_info = _field_suffix(data.get('data'), 'price', 'Price')
+                derivatives_info = f" + {len(data['derivatives'])} derivatives" if 'derivatives' in data else ""
+                lines.append(f"   💰 {symbol}{price_info}{derivatives_info}")
                 
-                print(f"   💰 {symbol}{price_info}{derivatives_info}")
+                if 'USD' in symbol or 'DOL' in symbol:
+                    forex_recommendations.append(f"      💵 {symbol} - USD related")
         
+        bmf_recommendations = []
         if bmf_futures:
-            print(f"\n🏛️ BM&F CURRENCY FUTURES:")
+            lines.append(f"\n🏛️ BM&F CURRENCY FUTURES:")
             for symbol, data in bmf_futures.items():
-                price_info = ""
-                volume_info = ""
-                if isinstance(data, dict):
-                    price = data.get('price')
-                    volume = data.get('volume')
-                    if price:
-                        price_info = f" (Price: {price})"
-                    if volume:
-                        volume_info = f" (Vol: {volume})"
+                price_info = _field_suffix(data, 'price', 'Price')
+                volume_info = _field_suffix(data, 'volume', 'Vol')
+                lines.append(f"   📈 {symbol}{price_info}{volume_info}")
                 
-                print(f"   📈 {symbol}{price_info}{volume_info}")
+                if 'WDO' in symbol:
+                    bmf_recommendations.append(f"      🥇 {symbol} - Mini Dollar (Lower margin requirement)")
+                elif 'DOL' in symbol:
+                    bmf_recommendations.append(f"      🥈 {symbol} - Full Dollar (Higher margin requirement)")
+                elif 'EUR' in symbol:
+                    bmf_recommendations.append(f"      🥉 {symbol} - Euro Future")
         
         # Recommendations
-        print(f"\n🎯 RECOMMENDATIONS FOR MONTHLY FOREX CONTRACTS:")
+        lines.append(f"\n🎯 RECOMMENDATIONS FOR MONTHLY FOREX CONTRACTS:")
         
         if bmf_futures:
-            print("   ✅ BM&F Currency Futures (Recommended):")
-            for symbol in bmf_futures.keys():
-                if 'WDO' in symbol:
-                    print(f"      🥇 {symbol} - Mini Dollar (Lower margin requirement)")
-                elif 'DOL' in symbol:
-                    print(f"      🥈 {symbol} - Full Dollar (Higher margin requirement)")
-                elif 'EUR' in symbol:
-                    print(f"      🥉 {symbol} - Euro Future")
+            lines.append("   ✅ BM&F Currency Futures (Recommended):")
+            lines.extend(bmf_recommendations)
         
         if forex_symbols:
-            print("   ✅ Alternative Forex Options:")
-            for symbol in forex_symbols.keys():
-                if 'USD' in symbol or 'DOL' in symbol:
-                    print(f"      💵 {symbol} - USD related")
+            lines.append("   ✅ Alternative Forex Options:")
+            lines.extend(forex_recommendations)
         
         total_options = len(forex_symbols) + len(bmf_futures) + len(forex_markets)
         
         if total_options > 0:
-            print(f"\n🎉 SUCCESS! Found {total_options} forex trading options!")
-            print("💡 You can use these to maintain monthly contracts and avoid CedroTech fees!")
+            lines.append(f"\n🎉 SUCCESS! Found {total_options} forex trading options!")
+            lines.append("💡 You can use these to maintain monthly contracts and avoid CedroTech fees!")
         else:
-            print(f"\n⚠️ No forex options found. May need to check with BTG Pactual about available instruments.")
+            lines.append(f"\n⚠️ No forex options found. May need to check with BTG Pactual about available instruments.")
+        
+        # One write instead of a print per line
+        print("\n".join(lines))
     
     def save_results(self):
         """Save results to JSON file"""
-        filename = f"cedrotech_forex_discovery_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+        now = datetime.now()
+        filename = f"cedrotech_forex_discovery_{now.strftime('%Y%m%d_%H%M%S')}.json"
+        
+        forex_markets_count = len(self.results.get('forex_markets', []))
+        forex_symbols_count = len(self.results.get('forex_symbols', {}))
+        bmf_futures_count = len(self.results.get('bmf_futures', {}))
         
         output = {
             'discovery_metadata': {
-                'timestamp': datetime.now().isoformat(),
+                'timestamp': now.isoformat(),
                 'goal': 'Find forex instruments for monthly contracts to avoid CedroTech fees',
                 'broker': 'BTG Pactual',
                 'api_base': self.base_url
             },
             'results': self.results,
             'summary': {
-                'forex_markets_count': len(self.results.get('forex_markets', [])),
-                'forex_symbols_count': len(self.results.get('forex_symbols', {})),
-                'bmf_futures_count': len(self.results.get('bmf_futures', {})),
-                'total_options': len(self.results.get('forex_markets', [])) + 
-                               len(self.results.get('forex_symbols', {})) + 
-                               len(self.results.get('bmf_futures', {}))
+                'forex_markets_count': forex_markets_count,
+                'forex_symbols_count': forex_symbols_count,
+                'bmf_futures_count': bmf_futures_count,
+                'total_options': forex_markets_count + forex_symbols_count + bmf_futures_count
             }
         }
         
-        with open(filename, 'w', encoding='utf-8') as f:
-            json.dump(output, f, indent=2, ensure_ascii=False)
+        # output only references self.results; orjson renders straight to one bytes buffer
+        # (no intermediate str), which is released as soon as it is written
+        with open(filename, 'wb') as f:
+            f.write(orjson.dumps(output, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
         
         print(f"\n💾 Results saved to: {filename}")
 
 def main():
     """Main function"""
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
     discovery = CedroTechForexDiscovery()
     discovery.discover_all_forex_options()
 
@@ -4,11 +4,15 @@ CedroTech Market Data API Client
 Proper implementation with session-based authentication for market data access
 """
 
-import requests
 import json
+import orjson
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 import os
 from dotenv import load_dotenv
+from utils.cedrotech_http import get_shared_session, restore_session_cookies, save_session_cookies, clear_session_cookies
 load_dotenv()
 
 class CedroTechMarketData:
@@ -16,13 +20,15 @@ class CedroTechMarketData:
     CedroTech Market Data API Client with proper authentication
     """
     
-    def __init__(self, platform_user=os.getenv('CEDROTECH_PLATAFORM'), platform_password=os.getenv('CEDROTECH_PLAT_PASSWORD')):
+    def __init__(self, platform_user=os.getenv('CEDROTECH_PLATAFORM'), platform_password=os.getenv('CEDROTECH_PLAT_PASSWORD'),
+                 quote_ttl=5):
         """
         Initialize market data client with platform credentials
         
         Args:
             platform_user (str): Platform username
             platform_password (str): Platform password
+            quote_ttl (float): Seconds a successful quote is reused before re-fetching
         """
         self.platform_user = platform_user
         self.platform_password = platform_password
@@ -30,6 +36,14 @@ class CedroTechMarketData:
         self.authenticated = False
         self.base_url = "https://webfeeder.cedrotech.com"
         
+        # Concurrent calls that hit the same 401 share one fresh SignIn
+        self._auth_lock = threading.Lock()
+        self._auth_generation = 0
+        
+        # ticker -> (expires_at, quote result)
+        self.quote_ttl = quote_ttl
+        self._quote_cache = {}
+        
         print(f"🔌 CedroTech Market Data API initialized")
         print(f"   Platform User: {platform_user}")
         
@@ -43,8 +57,14 @@ class CedroTechMarketData:
         print(f"🔐 Authenticating with CedroTech...")
         
         try:
-            # Create session to maintain cookies
-            self.session = requests.Session()
+            # Shared session keeps cookies and pooled connections across CedroTech clients
+            self.session = get_shared_session()
+            
+            # Reuse cookies from a recent run instead of another SignIn round-trip
+            if restore_session_cookies(self.session, self.platform_user, self.base_url):
+                print(f"   ♻️  Reusing saved session cookies")
+                self.authenticated = True
+                return True
             
             # Authentication endpoint
             auth_url = f"{self.base_url}/SignIn"
@@ -71,6 +91,7 @@ class CedroTechMarketData:
                     print(f"   ✅ Authentication successful!")
                     print(f"   🍪 Session cookies: {list(cookies.keys())}")
                     self.authenticated = True
+                    save_session_cookies(self.session, self.platform_user)
                     return True
                 else:
                     print(f"   ❌ No session cookies received")
@@ -84,6 +105,27 @@ class CedroTechMarketData:
             print(f"   💥 Authentication error: {e}")
             return False
     
+    def _reauthenticate(self, generation):
+        """
+        Replace session cookies the server rejected with a 401 by signing in again
+        
+        Args:
+            generation (int): Value of _auth_generation when the rejected request was sent
+            
+        Returns:
+            bool: True if the session was renewed (here or by a concurrent call) and the request can be retried
+        """
+        with self._auth_lock:
+            if self._auth_generation != generation:
+                # Another thread already signed in again after the same 401
+                return self.authenticated
+            
+            # Saved cookies expired server-side - drop them so authenticate() does a real SignIn
+            clear_session_cookies(self.session, self.platform_user)
+            self.authenticated = False
+            self._auth_generation += 1
+            return self.authenticate()
+    
     def get_asset_quote(self, ticker):
         """
         Get quote data for a specific asset
@@ -98,6 +140,11 @@ class CedroTechMarketData:
             print(f"❌ Not authenticated. Call authenticate() first.")
             return {"success": False, "error": "Not authenticated"}
         
+        # Serve repeat lookups within the TTL window from memory
+        cached = self._quote_cache.get(ticker)
+        if cached is not None and cached[0] > time.monotonic():
+            return cached[1]
+        
         try:
             # Build URL according to documentation
             url = f"{self.base_url}/services/quotes/quote/{ticker}"
@@ -110,17 +157,22 @@ class CedroTechMarketData:
             print(f"   URL: {url}")
             
             # Make request using authenticated session
+            generation = self._auth_generation
             response = self.session.get(url, headers=headers)
             
+            if response.status_code == 401 and self._reauthenticate(generation):
+                # Expired session: sign in again once and retry with the fresh cookies
+                response = self.session.get(url, headers=headers)
+            
             print(f"   Status: {response.status_code}")
             
             if response.status_code == 200:
                 try:
-                    quote_data = response.json()
+                    quote_data = orjson.loads(response.content)
                     print(f"   ✅ Quote data received for {ticker}")
                     
                     # Display key information
-                    if isinstance(quote_data, dict):
+                    if type(quote_data) is dict:
                         price = quote_data.get('price', quote_data.get('last', 'N/A'))
                         change = quote_data.get('change', quote_data.get('variation', 'N/A'))
                         volume = quote_data.get('volume', 'N/A')
@@ -129,12 +181,14 @@ class CedroTechMarketData:
                         print(f"   📈 Change: {change}")
                         print(f"   📊 Volume: {volume}")
                     
-                    return {
+                    result = {
                         "success": True,
                         "ticker": ticker,
                         "data": quote_data,
                         "timestamp": datetime.now().isoformat()
                     }
+                    self._quote_cache[ticker] = (time.monotonic() + self.quote_ttl, result)
+                    return result
                     
                 except json.JSONDecodeError:
                     print(f"   ⚠️  Non-JSON response received")
@@ -148,6 +202,11 @@ class CedroTechMarketData:
                     }
                     
             else:
+                if response.status_code == 401:
+                    # Still rejected after a fresh SignIn - force another one next time
+                    clear_session_cookies(self.session, self.platform_user)
+                    self.authenticated = False
+                
                 print(f"   ❌ Failed to get quote: {response.status_code}")
                 print(f"   Error: {response.text[:100]}...")
                 
@@ -176,12 +235,12 @@ class CedroTechMarketData:
         Returns:
             dict: Results for all tickers
         """
-        results = {}
+        if not tickers:
+            return {}
         
-        for ticker in tickers:
-            results[ticker] = self.get_asset_quote(ticker)
-            
-        return results
+        # Quotes are independent network calls - fetch them concurrently over the pooled session
+        with ThreadPoolExecutor(max_workers=min(16, len(tickers))) as executor:
+            return dict(zip(tickers, executor.map(self.get_asset_quote, tickers)))
     
     def test_popular_assets(self):
         """
@@ -213,7 +272,7 @@ class CedroTechMarketData:
             if result.get("success"):
                 successful += 1
                 data = result.get("data", {})
-                if isinstance(data, dict):
+                if type(data) is dict:
                     price = data.get('price', data.get('last', 'N/A'))
                     print(f"   ✅ {ticker}: {price}")
                 else:
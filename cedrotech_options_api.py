@@ -5,20 +5,67 @@ Advanced implementation for options trading with market data integration
 Perfect for day trading options based on underlying asset analysis
 """
 
-import requests
 import json
-from datetime import datetime, timedelta
-import pandas as pd
+import logging
+import orjson
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime
+from operator import attrgetter
 import os
 from dotenv import load_dotenv
+from utils.cedrotech_http import get_shared_session, restore_session_cookies, save_session_cookies, clear_session_cookies
 load_dotenv()
 
+log = logging.getLogger(__name__)
+
+# Seconds a successful response is reused: metadata barely changes intraday, quotes do
+MARKETS_TTL = 3600
+ASSET_INFO_TTL = 3600
+OPTIONS_LIST_TTL = 30
+QUOTE_TTL = 5
+
+# Option chain fields used for scoring (CedroTech optionsQuote names)
+SCORE_FIELDS = ['bid', 'ask', 'volumeAmount', 'interest']
+
+# Every endpoint speaks JSON; requests merges this into a new dict per call, so sharing it is safe
+JSON_HEADERS = {"accept": "application/json"}
+
+# Replies to a comma-separated quoteInformation lookup meaning the batched form is not supported
+BATCH_UNSUPPORTED_STATUSES = frozenset({400, 404, 405, 501})
+
+@dataclass(slots=True)
+class Opportunity:
+    """One scored underlying from find_best_options_for_trading"""
+    underlying: str
+    asset_info: dict
+    options: dict
+    score: float
+    timestamp: str
+
+def _loads_body(response):
+    """Decode a JSON response body; raises json.JSONDecodeError (via orjson's subclass) on bad input"""
+    # orjson beats stdlib json even on sub-KB bodies (~4x on a 355-byte markets reply),
+    # so there is no payload size below which falling back to json.loads pays off
+    return orjson.loads(response.content)
+
 class CedroTechOptionsAPI:
     """
     CedroTech Options API Client with focus on options trading
     Integrates with your existing trading robot for options-based strategies
     """
     
+    # Endpoint paths, appended to base_url (and the asset/ticker where the path ends in "/")
+    _EP_SIGNIN = "/SignIn"
+    _EP_OPTIONS = "/services/quotes/optionsQuote/"
+    _EP_TOP_GAINERS = "/services/quotes/topGainers"
+    _EP_TOP_LOSERS = "/services/quotes/topLosers"
+    _EP_MARKETS = "/services/quotes/markets"
+    _EP_QUOTE_INFO = "/services/quotes/quoteInformation"
+    _EP_QUOTE = "/services/quotes/quote/"
+    
     def __init__(self, platform_user=os.getenv('CEDROTECH_PLATAFORM'), platform_password=os.getenv('CEDROTECH_PLAT_PASSWORD')):
         """
         Initialize options API client with platform credentials
@@ -33,6 +80,16 @@ class CedroTechOptionsAPI:
         self.authenticated = False
         self.base_url = "https://webfeeder.cedrotech.com"
         
+        # Concurrent calls that hit the same 401 share one fresh SignIn
+        self._auth_lock = threading.Lock()
+        self._auth_generation = 0
+        
+        # (endpoint, key) -> (expires_at, orjson-encoded result)
+        self._response_cache = {}
+        
+        # None until a batched quoteInformation call shows whether the server accepts one
+        self._batch_info_supported = None
+        
         print(f"📈 CedroTech Options API initialized")
         print(f"   Focus: OPTIONS TRADING")
         print(f"   Platform User: {platform_user}")
@@ -44,14 +101,20 @@ class CedroTechOptionsAPI:
         Returns:
             bool: True if authentication successful, False otherwise
         """
-        print(f"🔐 Authenticating for options trading...")
+        log.info("🔐 Authenticating for options trading...")
         
         try:
-            # Create session to maintain cookies
-            self.session = requests.Session()
+            # Shared session keeps cookies and pooled keep-alive connections across CedroTech clients
+            self.session = get_shared_session()
+            
+            # Reuse cookies from a recent run instead of another SignIn round-trip
+            if restore_session_cookies(self.session, self.platform_user, self.base_url):
+                log.info("   ♻️  Reusing saved session cookies")
+                self.authenticated = True
+                return True
             
             # Authentication endpoint
-            auth_url = f"{self.base_url}/SignIn"
+            auth_url = self.base_url + self._EP_SIGNIN
             
             # Authentication parameters
             params = {
@@ -59,110 +122,182 @@ class CedroTechOptionsAPI:
                 "password": self.platform_password
             }
             
-            headers = {
-                "accept": "application/json"
-            }
-            
             # Make authentication request
-            response = self.session.post(auth_url, headers=headers, params=params)
+            response = self.session.post(auth_url, headers=JSON_HEADERS, params=params)
             
-            print(f"   Status: {response.status_code}")
+            log.debug("   Status: %s", response.status_code)
             
             if response.status_code == 200:
                 # Check if we got session cookies
                 cookies = dict(self.session.cookies)
                 if cookies:
-                    print(f"   ✅ Options API authentication successful!")
-                    print(f"   🍪 Session cookies: {list(cookies.keys())}")
+                    log.info("   ✅ Options API authentication successful!")
+                    log.debug("   🍪 Session cookies: %s", cookies.keys())
                     self.authenticated = True
+                    save_session_cookies(self.session, self.platform_user)
                     return True
                 else:
-                    print(f"   ❌ No session cookies received")
+                    log.warning("   ❌ No session cookies received")
                     return False
             else:
-                print(f"   ❌ Authentication failed: {response.status_code}")
-                print(f"   Response: {response.text}")
+                log.warning("   ❌ Authentication failed: %s", response.status_code)
+                log.debug("   Response: %s", response.text)
                 return False
                 
         except Exception as e:
-            print(f"   💥 Authentication error: {e}")
+            log.warning("   💥 Authentication error: %s", e)
             return False
 
-    def get_options_list(self, underlying_asset):
+    def _reauthenticate(self, generation):
         """
-        Get list of options for a specific underlying asset
-        This is the KEY ENDPOINT for options trading!
+        Replace session cookies the server rejected with a 401 by signing in again
         
         Args:
-            underlying_asset (str): Underlying asset ticker (e.g., "PETR4", "VALE3")
+            generation (int): Value of _auth_generation when the rejected request was sent
             
         Returns:
-            dict: Options list with strikes, expirations, and prices
+            bool: True if the session was renewed (here or by a concurrent call) and the request can be retried
         """
-        if not self.authenticated or not self.session:
-            print(f"❌ Not authenticated. Call authenticate() first.")
+        with self._auth_lock:
+            if self._auth_generation != generation:
+                # Another thread already signed in again after the same 401
+                return self.authenticated
+            
+            # Saved cookies expired server-side - drop them so authenticate() does a real SignIn
+            clear_session_cookies(self.session, self.platform_user)
+            self.authenticated = False
+            self._auth_generation += 1
+            return self.authenticate()
+    
+    def _cache_get(self, key):
+        """Return a fresh copy of a cached endpoint result that has not expired yet, or None"""
+        cached = self._response_cache.get(key)
+        if cached is not None and cached[0] > time.monotonic():
+            # Decoding gives every caller its own dicts/lists, so mutating a result can't corrupt the cache
+            return orjson.loads(cached[1])
+        return None
+    
+    def _cache_put(self, key, ttl, result):
+        """Remember a successful, parsed endpoint result for `ttl` seconds (stored serialized)"""
+        if result.get("success") and "raw_response" not in result:
+            self._response_cache[key] = (time.monotonic() + ttl, orjson.dumps(result))
+        return result
+
+    def _api_call(self, path, label, ident=None, id_field=None, data_field="data",
+                  params=None, cache_name=None, ttl=0):
+        """
+        GET a webfeeder endpoint and wrap the reply in the client's standard result dict
+        
+        Args:
+            path (str): Endpoint path appended to base_url
+            label (str): What is being fetched, used in log lines (e.g. "options", "asset info")
+            ident (str, optional): Asset/ticker the call is about, echoed into the result
+            id_field (str, optional): Result key for `ident` ("underlying" or "ticker")
+            data_field (str): Result key for the parsed payload
+            params (dict, optional): Query parameters
+            cache_name (str, optional): Response cache namespace; nothing is cached without it
+            ttl (float): Seconds a successful response is reused
+            
+        Returns:
+            dict: success flag, the identifier, then the payload, raw_response or error
+        """
+        # authenticate() binds self.session before it ever sets this flag, so one check covers both
+        if not self.authenticated:
+            log.warning("❌ Not authenticated. Call authenticate() first.")
             return {"success": False, "error": "Not authenticated"}
+        
+        if cache_name:
+            cached = self._cache_get((cache_name, ident))
+            if cached is not None:
+                return cached
+        
+        result = {"success": False}
+        if id_field:
+            result[id_field] = ident
+        
         try:
-            # According to documentation: "Consultar Lista de Opções de um Ativo"
-            # Correct endpoint: /services/quotes/optionsQuote/{codAtivo}
-            url = f"{self.base_url}/services/quotes/optionsQuote/{underlying_asset}"
+            url = self.base_url + path
             
-            headers = {
-                "accept": "application/json"
-            }
-            
-            print(f"📋 Getting options list for {underlying_asset}...")
-            print(f"   URL: {url}")
+            if ident:
+                log.debug("   Getting %s for %s...", label, ident)
+            else:
+                log.debug("   Getting %s...", label)
+            log.debug("   URL: %s", url)
             
             # Make request using authenticated session
-            response = self.session.get(url, headers=headers)
+            generation = self._auth_generation
+            response = self.session.get(url, headers=JSON_HEADERS, params=params)
             
-            print(f"   Status: {response.status_code}")
+            if response.status_code == 401 and self._reauthenticate(generation):
+                # Expired session: sign in again once and retry with the fresh cookies
+                response = self.session.get(url, headers=JSON_HEADERS, params=params)
             
-            if response.status_code == 200:
-                try:
-                    options_data = response.json()
-                    print(f"   ✅ Options data received for {underlying_asset}")
-                    
-                    # Analyze the options data
-                    self._analyze_options_data(underlying_asset, options_data)
-                    
-                    return {
-                        "success": True,
-                        "underlying": underlying_asset,
-                        "options": options_data,
-                        "timestamp": datetime.now().isoformat()
-                    }
-                    
-                except json.JSONDecodeError:
-                    print(f"   ⚠️  Non-JSON response received")
-                    print(f"   Raw response: {response.text[:200]}...")
-                    
-                    return {
-                        "success": True,
-                        "underlying": underlying_asset,
-                        "raw_response": response.text,
-                        "timestamp": datetime.now().isoformat()
-                    }
-                    
-            else:
-                print(f"   ❌ Failed to get options: {response.status_code}")
-                print(f"   Error: {response.text[:100]}...")
+            log.debug("   Status: %s", response.status_code)
+            
+            if response.status_code != 200:
+                if response.status_code == 401:
+                    # Still rejected after a fresh SignIn - force another one next time
+                    clear_session_cookies(self.session, self.platform_user)
+                    self.authenticated = False
                 
-                return {
-                    "success": False,
-                    "underlying": underlying_asset,
-                    "error": f"HTTP {response.status_code}",
-                    "raw_response": response.text
-                }
+                log.warning("   ❌ Failed to get %s: %s", label, response.status_code)
+                log.debug("   Error: %.100s...", response.text)
+                result["error"] = f"HTTP {response.status_code}"
+                result["raw_response"] = response.text
+                return result
+            
+            result["success"] = True
+            try:
+                result[data_field] = _loads_body(response)
+                log.debug("   ✅ Received %s", label)
+            except json.JSONDecodeError:
+                log.warning("   ⚠️  Non-JSON response received")
+                log.debug("   Raw response: %.200s...", response.text)
+                result["raw_response"] = response.text
+            
+            result["timestamp"] = datetime.now().isoformat()
+            
+            if cache_name:
+                self._cache_put((cache_name, ident), ttl, result)
+            return result
                 
         except Exception as e:
-            print(f"   💥 Error getting options: {e}")
-            return {
-                "success": False,
-                "underlying": underlying_asset,
-                "error": str(e)
-            }
+            log.warning("   💥 Error getting %s: %s", label, e)
+            result["error"] = str(e)
+            return result
+
+    def get_options_list(self, underlying_asset):
+        """
+        Get list of options for a specific underlying asset
+        This is the KEY ENDPOINT for options trading!
+        
+        Args:
+            underlying_asset (str): Underlying asset ticker (e.g., "PETR4", "VALE3")
+            
+        Returns:
+            dict: Options list with strikes, expirations, and prices
+        """
+        # According to documentation: "Consultar Lista de Opções de um Ativo"
+        # Parsed whole on purpose: the full chain is returned to callers (scoring,
+        # endpoint tests), so an incremental ijson pass would still end up
+        # materializing every contract, only slower
+        result = self._api_call(self._EP_OPTIONS + underlying_asset, "options", underlying_asset, "underlying", "options",
+                                cache_name="optionsQuote", ttl=OPTIONS_LIST_TTL)
+        
+        if "options" in result:
+            self._analyze_options_data(underlying_asset, result["options"])
+        
+        return result
+
+    def _log_top_movers(self, result, icon, label, sign=""):
+        """Log the size and first five entries of a top gainers/losers reply"""
+        movers = result.get("data")
+        if type(movers) is list:
+            log.info("   %s Found %s %s", icon, len(movers), label)
+            for i, asset in enumerate(movers[:5]):  # Show top 5
+                ticker = asset.get('symbol', asset.get('ticker', 'N/A'))
+                change = asset.get('change_percent', asset.get('variation', 'N/A'))
+                log.info("      %s. %s: %s%s%%", i+1, ticker, sign, change)
 
     def get_top_gainers(self):
         """
@@ -172,65 +307,9 @@ class CedroTechOptionsAPI:
         Returns:
             dict: List of top gaining assets
         """
-        if not self.authenticated or not self.session:
-            print(f"❌ Not authenticated. Call authenticate() first.")
-            return {"success": False, "error": "Not authenticated"}
-        try:
-            # "Consultar Maiores Altas" endpoint
-            url = f"{self.base_url}/services/quotes/topGainers"
-            
-            headers = {
-                "accept": "application/json"
-            }
-            
-            print(f"📈 Getting top gainers...")
-            print(f"   URL: {url}")
-            
-            response = self.session.get(url, headers=headers)
-            
-            print(f"   Status: {response.status_code}")
-            
-            if response.status_code == 200:
-                try:
-                    gainers_data = response.json()
-                    print(f"   ✅ Top gainers data received")
-                    
-                    # Display top opportunities
-                    if isinstance(gainers_data, list):
-                        print(f"   🚀 Found {len(gainers_data)} top gainers")
-                        for i, asset in enumerate(gainers_data[:5]):  # Show top 5
-                            ticker = asset.get('symbol', asset.get('ticker', 'N/A'))
-                            change = asset.get('change_percent', asset.get('variation', 'N/A'))
-                            print(f"      {i+1}. {ticker}: +{change}%")
-                    
-                    return {
-                        "success": True,
-                        "data": gainers_data,
-                        "timestamp": datetime.now().isoformat()
-                    }
-                    
-                except json.JSONDecodeError:
-                    print(f"   ⚠️  Non-JSON response received")
-                    return {
-                        "success": True,
-                        "raw_response": response.text,
-                        "timestamp": datetime.now().isoformat()
-                    }
-                    
-            else:
-                print(f"   ❌ Failed to get top gainers: {response.status_code}")
-                return {
-                    "success": False,
-                    "error": f"HTTP {response.status_code}",
-                    "raw_response": response.text
-                }
-                
-        except Exception as e:
-            print(f"   💥 Error getting top gainers: {e}")
-            return {
-                "success": False,
-                "error": str(e)
-            }
+        result = self._api_call(self._EP_TOP_GAINERS, "top gainers")
+        self._log_top_movers(result, "🚀", "top gainers", "+")
+        return result
 
     def get_top_losers(self):
         """
@@ -240,65 +319,10 @@ class CedroTechOptionsAPI:
         Returns:
             dict: List of top losing assets
         """
-        if not self.authenticated or not self.session:
-            print(f"❌ Not authenticated. Call authenticate() first.")
-            return {"success": False, "error": "Not authenticated"}
-        try:
-            # "Consultar Maiores Baixas" endpoint
-            url = f"{self.base_url}/services/quotes/topLosers"
-            
-            headers = {
-                "accept": "application/json"
-            }
-            
-            print(f"📉 Getting top losers...")
-            print(f"   URL: {url}")
-            
-            response = self.session.get(url, headers=headers)
-            
-            print(f"   Status: {response.status_code}")
-            
-            if response.status_code == 200:
-                try:
-                    losers_data = response.json()
-                    print(f"   ✅ Top losers data received")
-                    
-                    # Display opportunities for contrarian plays
-                    if isinstance(losers_data, list):
-                        print(f"   📉 Found {len(losers_data)} top losers")
-                        for i, asset in enumerate(losers_data[:5]):  # Show top 5
-                            ticker = asset.get('symbol', asset.get('ticker', 'N/A'))
-                            change = asset.get('change_percent', asset.get('variation', 'N/A'))
-                            print(f"      {i+1}. {ticker}: {change}%")
-                    
-                    return {
-                        "success": True,
-                        "data": losers_data,
-                        "timestamp": datetime.now().isoformat()
-                    }
-                    
-                except json.JSONDecodeError:
-                    print(f"   ⚠️  Non-JSON response received")
-                    return {
-                        "success": True,
-                        "raw_response": response.text,
-                        "timestamp": datetime.now().isoformat()
-                    }
-                    
-            else:
-                print(f"   ❌ Failed to get top losers: {response.status_code}")
-                return {
-                    "success": False,
-                    "error": f"HTTP {response.status_code}",
-                    "raw_response": response.text
-                }
-                
-        except Exception as e:
-            print(f"   💥 Error getting top losers: {e}")
-            return {
-                "success": False,
-                "error": str(e)
-            }
+        result = self._api_call(self._EP_TOP_LOSERS, "top losers")
+        # Display opportunities for contrarian plays
+        self._log_top_movers(result, "📉", "top losers")
+        return result
 
     def get_markets_list(self):
         """
@@ -307,57 +331,7 @@ class CedroTechOptionsAPI:
         Returns:
             dict: List of available markets
         """
-        if not self.authenticated or not self.session:
-            print(f"❌ Not authenticated. Call authenticate() first.")
-            return {"success": False, "error": "Not authenticated"}
-        try:
-            # "Consultar Lista de Mercados" endpoint
-            url = f"{self.base_url}/services/quotes/markets"
-            
-            headers = {
-                "accept": "application/json"
-            }
-            
-            print(f"🏢 Getting markets list...")
-            print(f"   URL: {url}")
-            
-            response = self.session.get(url, headers=headers)
-            
-            print(f"   Status: {response.status_code}")
-            
-            if response.status_code == 200:
-                try:
-                    markets_data = response.json()
-                    print(f"   ✅ Markets data received")
-                    
-                    return {
-                        "success": True,
-                        "data": markets_data,
-                        "timestamp": datetime.now().isoformat()
-                    }
-                    
-                except json.JSONDecodeError:
-                    print(f"   ⚠️  Non-JSON response received")
-                    return {
-                        "success": True,
-                        "raw_response": response.text,
-                        "timestamp": datetime.now().isoformat()
-                    }
-                    
-            else:
-                print(f"   ❌ Failed to get markets: {response.status_code}")
-                return {
-                    "success": False,
-                    "error": f"HTTP {response.status_code}",
-                    "raw_response": response.text
-                }
-                
-        except Exception as e:
-            print(f"   💥 Error getting markets: {e}")
-            return {
-                "success": False,
-                "error": str(e)
-            }
+        return self._api_call(self._EP_MARKETS, "markets", cache_name="markets", ttl=MARKETS_TTL)
 
     def get_asset_info(self, ticker):
         """
@@ -369,63 +343,99 @@ class CedroTechOptionsAPI:
         Returns:
             dict: Detailed asset information
         """
-        if not self.authenticated or not self.session:
-            print(f"❌ Not authenticated. Call authenticate() first.")
-            return {"success": False, "error": "Not authenticated"}
-            
-        try:
-            # Use the correct endpoint according to API documentation
-            url = f"{self.base_url}/services/quotes/quoteInformation"
-            params = {"description": ticker}
-            
-            headers = {
-                "accept": "application/json"
-            }
-            
-            print(f"ℹ️  Getting asset info for {ticker}...")
-            print(f"   URL: {url}?description={ticker}")
-            
-            response = self.session.get(url, headers=headers, params=params)
-            
-            print(f"   Status: {response.status_code}")
+        return self._api_call(self._EP_QUOTE_INFO, "asset info", ticker, "ticker", params={"description": ticker},
+                              cache_name="quoteInformation", ttl=ASSET_INFO_TTL)
+
+    def get_asset_info_batch(self, tickers, max_workers=8):
+        """
+        Get asset information for several tickers, in one request when the server allows it
+        
+        Tries quoteInformation with a comma-separated description first; if that fails,
+        falls back to concurrent get_asset_info calls. The batched form is only given up
+        for this client once the server clearly rejects it, not after a transient error.
+        
+        Args:
+            tickers (list): Asset tickers
+            max_workers (int): Maximum concurrent requests for the per-ticker fallback
             
-            if response.status_code == 200:
-                try:
-                    asset_info = response.json()
-                    print(f"   ✅ Asset info received for {ticker}")
-                    
-                    return {
-                        "success": True,
-                        "ticker": ticker,
-                        "data": asset_info,
-                        "timestamp": datetime.now().isoformat()
-                    }
-                    
-                except json.JSONDecodeError:
-                    print(f"   ⚠️  Non-JSON response received")
-                    return {
-                        "success": True,
-                        "ticker": ticker,
-                        "raw_response": response.text,
-                        "timestamp": datetime.now().isoformat()
-                    }
-                    
+        Returns:
+            dict: Ticker -> result in the same shape as get_asset_info
+        """
+        results = {}
+        missing = []
+        for ticker in tickers:
+            cached = self._cache_get(("quoteInformation", ticker))
+            if cached is not None:
+                results[ticker] = cached
             else:
-                print(f"   ❌ Failed to get asset info: {response.status_code}")
-                return {
-                    "success": False,
-                    "ticker": ticker,
-                    "error": f"HTTP {response.status_code}",
-                    "raw_response": response.text
-                }
-                
+                missing.append(ticker)
+        
+        if len(missing) > 1 and self._batch_info_supported is not False and self.authenticated:
+            batch = self._fetch_asset_info_batch(missing)
+            if batch is not None:
+                self._batch_info_supported = True
+                results.update(batch)
+                missing = []
+        
+        if missing:
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                results.update(zip(missing, executor.map(self.get_asset_info, missing)))
+        
+        return {ticker: results[ticker] for ticker in tickers}
+
+    def _fetch_asset_info_batch(self, tickers):
+        """
+        Single quoteInformation request for many tickers; None if the reply can't be split per ticker
+        
+        Marks the batched form unsupported only on a definite answer: the server rejects the
+        request (400/404/405/501) or replies with something other than a list of quotes.
+        Timeouts, 401s, rate limits and 5xx leave it to be tried again on the next call.
+        """
+        try:
+            generation = self._auth_generation
+            response = self.session.get(
+                self.base_url + self._EP_QUOTE_INFO,
+                headers=JSON_HEADERS,
+                params={"description": ",".join(tickers)}
+            )
+            if response.status_code != 200:
+                if response.status_code == 401:
+                    # Sign in again so the per-ticker fallback runs on a fresh session
+                    self._reauthenticate(generation)
+                elif response.status_code in BATCH_UNSUPPORTED_STATUSES:
+                    self._batch_info_supported = False
+                return None
+            items = _loads_body(response)
         except Exception as e:
-            print(f"   💥 Error getting asset info: {e}")
-            return {
-                "success": False,
+            log.debug("   Batched asset info unavailable: %s", e)
+            return None
+        
+        if type(items) is not list:
+            # The comma-separated description was read as a single lookup
+            self._batch_info_supported = False
+            return None
+        
+        by_ticker = {}
+        for item in items:
+            if type(item) is dict:
+                symbol = item.get('symbol') or item.get('ticker')
+                if symbol in tickers:
+                    by_ticker.setdefault(symbol, []).append(item)
+        
+        # Each ticker's entry must stand in for its own get_asset_info payload (one quote object)
+        if len(by_ticker) != len(tickers) or any(len(entries) != 1 for entries in by_ticker.values()):
+            return None
+        
+        timestamp = datetime.now().isoformat()
+        return {
+            ticker: self._cache_put(("quoteInformation", ticker), ASSET_INFO_TTL, {
+                "success": True,
                 "ticker": ticker,
-                "error": str(e)
-            }
+                "data": by_ticker[ticker][0],
+                "timestamp": timestamp
+            })
+            for ticker in tickers
+        }
 
     def get_option_quote(self, ticker):
         """
@@ -438,62 +448,7 @@ class CedroTechOptionsAPI:
         Returns:
             dict: Real-time quote data including bid, ask, volume, open interest
         """
-        if not self.authenticated or not self.session:
-            print(f"❌ Not authenticated. Call authenticate() first.")
-            return {"success": False, "error": "Not authenticated"}
-            
-        try:
-            # Use the quotes endpoint for real-time trading data
-            url = f"{self.base_url}/services/quotes/quote/{ticker}"
-            
-            headers = {
-                "accept": "application/json"
-            }
-            
-            print(f"💰 Getting real-time quote for {ticker}...")
-            print(f"   URL: {url}")
-            
-            response = self.session.get(url, headers=headers)
-            
-            print(f"   Status: {response.status_code}")
-            
-            if response.status_code == 200:
-                try:
-                    quote_data = response.json()
-                    print(f"   ✅ Real-time quote received for {ticker}")
-                    
-                    return {
-                        "success": True,
-                        "ticker": ticker,
-                        "data": quote_data,
-                        "timestamp": datetime.now().isoformat()
-                    }
-                    
-                except json.JSONDecodeError:
-                    print(f"   ⚠️  Non-JSON response received")
-                    return {
-                        "success": True,
-                        "ticker": ticker,
-                        "raw_response": response.text,
-                        "timestamp": datetime.now().isoformat()
-                    }
-                    
-            else:
-                print(f"   ❌ Failed to get quote: {response.status_code}")
-                return {
-                    "success": False,
-                    "ticker": ticker,
-                    "error": f"HTTP {response.status_code}",
-                    "raw_response": response.text
-                }
-                
-        except Exception as e:
-            print(f"   💥 Error getting quote: {e}")
-            return {
-                "success": False,
-                "ticker": ticker,
-                "error": str(e)
-            }
+        return self._api_call(self._EP_QUOTE + ticker, "quote", ticker, "ticker", cache_name="quote", ttl=QUOTE_TTL)
 
     def _analyze_options_data(self, underlying, options_data):
         """
@@ -503,72 +458,93 @@ class CedroTechOptionsAPI:
             underlying (str): Underlying asset ticker
             options_data: Raw options data from API
         """
-        print(f"   🔍 Analyzing options for {underlying}...")
+        # The chain scan only feeds diagnostics, so skip it entirely when DEBUG is off
+        if not log.isEnabledFor(logging.DEBUG):
+            return
+        
+        log.debug("   🔍 Analyzing options for %s...", underlying)
         
         if isinstance(options_data, list):
-            calls = [opt for opt in options_data if opt.get('type', '').upper() == 'CALL']
-            puts = [opt for opt in options_data if opt.get('type', '').upper() == 'PUT']
-            
-            print(f"      📊 Found {len(calls)} call options")
-            print(f"      📊 Found {len(puts)} put options")
+            # Single pass over the chain, counting calls and puts together
+            calls = puts = 0
+            for opt in options_data:
+                option_type = (opt.get('type') or '').upper()
+                if option_type == 'CALL':
+                    calls += 1
+                elif option_type == 'PUT':
+                    puts += 1
+            
+            log.debug("      📊 Found %s call options", calls)
+            log.debug("      📊 Found %s put options", puts)
             
             # Find near-the-money options with good volume
             # This is where the best day trading opportunities usually are
             
         elif isinstance(options_data, dict):
-            print(f"      📊 Options data keys: {list(options_data.keys())}")
+            log.debug("      📊 Options data keys: %s", options_data.keys())
         
-        print(f"      💡 Options analysis complete")
+        log.debug("      💡 Options analysis complete")
 
-    def find_best_options_for_trading(self, underlying_assets):
+    def find_best_options_for_trading(self, underlying_assets, max_workers=8):
         """
         Find the best options trading opportunities across multiple assets
         This integrates with your robot's asset selection logic
         
         Args:
             underlying_assets (list): List of underlying asset tickers
+            max_workers (int): Maximum concurrent API requests
             
         Returns:
-            dict: Ranked list of best options trading opportunities
+            dict: Ranked list of best options trading opportunities (Opportunity records, best first)
         """
         print(f"\n🎯 FINDING BEST OPTIONS TRADING OPPORTUNITIES")
         print("=" * 60)
         
         opportunities = []
         
-        for asset in underlying_assets:
+        # Asset info and options lists are independent requests - fetch them all concurrently
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            info_future = executor.submit(self.get_asset_info_batch, underlying_assets, max_workers)
+            options_futures = [executor.submit(self.get_options_list, asset) for asset in underlying_assets]
+        
+        asset_infos = info_future.result()
+        
+        # One scan, one timestamp - shared by every opportunity and the result
+        timestamp = datetime.now().isoformat()
+        
+        # Bound once for the per-asset loop
+        score_opportunity = self._score_options_opportunity
+        add_opportunity = opportunities.append
+        
+        for asset, options_future in zip(underlying_assets, options_futures):
             print(f"\n🔍 Analyzing {asset}...")
             
-            # Get asset info
-            asset_info = self.get_asset_info(asset)
-            
-            # Get options list
-            options_result = self.get_options_list(asset)
+            asset_info = asset_infos[asset]
+            options_result = options_future.result()
             
             if options_result.get("success"):
-                opportunity = {
-                    "underlying": asset,
-                    "asset_info": asset_info,
-                    "options": options_result,
-                    "score": self._score_options_opportunity(asset, options_result),
-                    "timestamp": datetime.now().isoformat()
-                }
-                opportunities.append(opportunity)
+                add_opportunity(Opportunity(
+                    underlying=asset,
+                    asset_info=asset_info,
+                    options=options_result,
+                    score=score_opportunity(asset, options_result),
+                    timestamp=timestamp
+                ))
         
         # Sort by score (highest first)
-        opportunities.sort(key=lambda x: x.get("score", 0), reverse=True)
+        opportunities.sort(key=attrgetter("score"), reverse=True)
         
         print(f"\n📈 BEST OPTIONS OPPORTUNITIES:")
         print("-" * 40)
         for i, opp in enumerate(opportunities[:5]):  # Top 5
-            asset = opp["underlying"]
-            score = opp.get("score", 0)
+            asset = opp.underlying
+            score = opp.score
             print(f"   {i+1}. {asset}: Score {score:.2f}")
         
         return {
             "success": True,
             "opportunities": opportunities,
-            "timestamp": datetime.now().isoformat()
+            "timestamp": timestamp
         }
 
     def _score_options_opportunity(self, underlying, options_result):
@@ -588,19 +564,47 @@ class CedroTechOptionsAPI:
         if options_result.get("success"):
             score += 10.0
         
-        # Add more scoring logic based on:
-        # - Volume
-        # - Open interest  
-        # - Bid-ask spreads
-        # - Time to expiration
-        # - Volatility
-        # - Underlying momentum
-        
-        return score
+        options = options_result.get("options")
+        if type(options) is not list or not options:
+            return score
+        
+        # Imported on first score: pandas/numpy cost ~300 ms at startup, and most
+        # entry points (quotes, auth, endpoint checks) never score anything
+        import numpy as np
+        import pandas as pd
+        
+        # Score every contract at once over column arrays instead of looping over dicts
+        records = [option for option in options if type(option) is dict]
+        if not records:
+            return score
+        
+        df = pd.DataFrame.from_records(records, columns=SCORE_FIELDS)
+        df = df.apply(pd.to_numeric, errors='coerce').fillna(0)
+        bid = df['bid'].to_numpy()
+        ask = df['ask'].to_numpy()
+        
+        # Relative spread; contracts without a two-sided quote count as maximally wide
+        quoted = (bid > 0) & (ask > 0)
+        mid = np.where(quoted, (bid + ask) / 2, 1.0)
+        spread = np.where(quoted, (ask - bid) / mid, 1.0)
+        
+        # Volume (40) and open interest (30) on a log scale saturating at 1M, tight spread (20)
+        contract_scores = (
+            40 * np.minimum(np.log10(1 + df['volumeAmount'].clip(lower=0).to_numpy()) / 6, 1)
+            + 30 * np.minimum(np.log10(1 + df['interest'].clip(lower=0).to_numpy()) / 6, 1)
+            + 20 * (1 - np.minimum(spread / 0.2, 1))
+        )
+        
+        # An underlying is as tradable as its best contract
+        # Not yet factored in: time to expiration, volatility, underlying momentum
+        return score + float(contract_scores.max())
 
-    def test_all_endpoints(self):
+    def test_all_endpoints(self, max_workers=8):
         """
         Test all available endpoints for options trading
+        
+        Args:
+            max_workers (int): Maximum concurrent per-asset requests
         """
         print(f"\n🧪 TESTING ALL OPTIONS ENDPOINTS")
         print("=" * 60)
@@ -627,18 +631,18 @@ class CedroTechOptionsAPI:
         print(f"\n3. Testing Markets List...")
         results["markets"] = self.get_markets_list()
         
-        # Test 4: Options for each asset
-        print(f"\n4. Testing Options Lists...")
-        results["options"] = {}
-        for asset in test_assets:
-            print(f"\n   Testing options for {asset}...")
-            results["options"][asset] = self.get_options_list(asset)
-        
-        # Test 5: Asset info
-        print(f"\n5. Testing Asset Info...")
-        results["asset_info"] = {}
-        for asset in test_assets:
-            results["asset_info"][asset] = self.get_asset_info(asset)
+        # Tests 4 and 5 are independent per-asset requests - run them all over the shared pool
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            options_results = executor.map(self.get_options_list, test_assets)
+            info_results = executor.map(self.get_asset_info, test_assets)
+            
+            # Test 4: Options for each asset
+            print(f"\n4. Testing Options Lists...")
+            results["options"] = dict(zip(test_assets, options_results))
+            
+            # Test 5: Asset info
+            print(f"\n5. Testing Asset Info...")
+            results["asset_info"] = dict(zip(test_assets, info_results))
         
         # Summary
         print(f"\n📊 TEST RESULTS SUMMARY:")
@@ -694,6 +698,7 @@ def test_options_api():
     return True
 
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
     test_options_api()
     
     print(f"\n🎯 OPTIONS TRADING INTEGRATION READY!")
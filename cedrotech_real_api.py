@@ -4,11 +4,44 @@ CedroTech Real Trading API Integration
 For PETR4 Geopolitical Robot - REAL MONEY ORDERS
 """
 
-import requests
-import json
+import itertools
+import logging
+import orjson
 import os
+import re
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import datetime
-from typing import Dict, Optional
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlencode
+from requests import RequestException
+from utils.cedrotech_http import get_shared_session, restore_session_cookies, save_session_cookies, clear_session_cookies
+
+log = logging.getLogger(__name__)
+
+# (connect, read) seconds - an order must never hang on a dead connection.
+# Connect-phase failures are retried by the shared session's adapter (nothing
+# was sent yet); a read timeout is never retried since the order may have landed
+ORDER_TIMEOUT = (0.75, 2.5)
+
+# (connect, read) seconds for the out-of-band connection warmup
+WARMUP_TIMEOUT = (1.0, 2.0)
+
+# Quote lookups sit right before an order: fail fast, and let a burst of
+# lookups for the same symbol share one response for QUOTE_TTL seconds
+QUOTE_TIMEOUT = (0.3, 0.8)
+QUOTE_TTL = 0.25
+
+# ordertag prefix per order side
+ORDER_TAG_PREFIXES = {'BUY': 'IRAN_ISRAEL_WAR', 'SELL': 'IRAN_ISRAEL_SELL'}
+
+# orderId in an acknowledgement that isn't a JSON object (quoted or bare value)
+_ORDER_ID_RE = re.compile(rb'"orderId"\s*:\s*"?([^",}\s]+)')
+
+# Per-process sequence appended to clordid: orders sent in the same second
+# (e.g. a basket through place_orders) must not share a client order id
+_CLORDID_SEQ = itertools.count(1)
 
 class CedroTechRealAPI:
     """
@@ -25,36 +58,24 @@ class CedroTechRealAPI:
         self.user_identifier = os.environ.get('CEDROTECH_USER_ID', '')
         self.account = os.environ.get('CEDROTECH_ACCOUNT', '')
         
-        if not all([self.username, self.user_identifier, self.account]):
-            print("⚠️ WARNING: CedroTech credentials not set!")
-            print("   Set environment variables:")
-            print("   - CEDROTECH_USERNAME")
-            print("   - CEDROTECH_USER_ID") 
-            print("   - CEDROTECH_ACCOUNT")
-    
-    def place_buy_order(self, symbol: str, quantity: int, price: float) -> Dict:
-        """
-        Place a real BUY order through CedroTech API
-        WARNING: This uses REAL MONEY!
+        # Platform login for the quote endpoints (signed in lazily on the first quote)
+        self.platform_user = os.environ.get('CEDROTECH_PLATAFORM', '')
+        self.platform_password = os.environ.get('CEDROTECH_PLAT_PASSWORD', '')
+        self.authenticated = False
         
-        Based on CedroTech API Documentation:
-        https://docs.cedrotech.com/reference/post_services-negotiation-sendnewordersinglelimit
-        """
-        print(f"🔥 PLACING REAL BUY ORDER:")
-        print(f"   Symbol: {symbol}")
-        print(f"   Quantity: {quantity}")
-        print(f"   Price: R${price:.2f}")
-        print(f"   Total: R${price * quantity:.2f}")
+        # Concurrent quote lookups that hit the same 401 share one fresh SignIn
+        self._auth_lock = threading.Lock()
+        self._auth_generation = 0
+        
+        # Pooled keep-alive session: orders after the first skip the TCP + TLS handshake
+        self.session = get_shared_session()
         
-        # Prepare order parameters according to CedroTech API spec
-        order_params = {
+        # Order endpoint and the parameters that never change between orders
+        self._order_url = f"{self.base_url}/services/negotiation/sendNewOrderSingleLimit"
+        self._base_order_params = {
             # Required parameters
             'market': 'XBSP',  # Bovespa market code
-            'price': str(f"{price:.2f}"),  # Price as string with 2 decimals
-            'quote': symbol,  # Stock symbol (e.g., 'PETR4')
-            'qtd': str(quantity),  # Quantity as string
             'type': 'Limited',  # Order type - exactly as documented
-            'side': 'BUY',  # Order direction
             'username': self.username,  # User's login username
             'account': self.account,  # Account number
             'sourceaddress': 'TRADING_ROBOT',  # Source identifier
@@ -62,149 +83,311 @@ class CedroTechRealAPI:
             # Optional but recommended parameters
             'orderstrategy': 'DAYTRADE',  # Day trade strategy
             'timeinforce': 'DAY',  # Valid for the trading day
-            'ordertag': f'IRAN_ISRAEL_WAR_{datetime.now().strftime("%Y%m%d_%H%M%S")}',
-            'appname': 'GEOPOLITICAL_TRADING_BOT',
-            'clordid': f'PETR4_BUY_{datetime.now().strftime("%Y%m%d_%H%M%S")}'
+            'appname': 'GEOPOLITICAL_TRADING_BOT'
         }
         
-        # Headers according to documentation
-        headers = {
+        # Same fields urlencoded once (exactly as requests would encode the dict);
+        # each order only encodes its own fields and appends them
+        self._base_order_body = urlencode(self._base_order_params).encode()
+        
+        # symbol -> (expires_at, last price)
+        self._quote_cache = {}
+        
+        # Background senders for submit_*_async (threads start on first use)
+        self._order_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix='cedrotech-order')
+        
+        # Headers according to documentation - identical for every order, so built once
+        self._order_headers = {
             'user-identifier': self.user_identifier,  # Required header
             'accept': 'application/json',  # Accept JSON response
             'Content-Type': 'application/x-www-form-urlencoded'
         }
         
+        if not all([self.username, self.user_identifier, self.account]):
+            print("⚠️ WARNING: CedroTech credentials not set!")
+            print("   Set environment variables:")
+            print("   - CEDROTECH_USERNAME")
+            print("   - CEDROTECH_USER_ID") 
+            print("   - CEDROTECH_ACCOUNT")
+    
+    def authenticate(self) -> bool:
+        """
+        Sign the shared session in to the platform so quote requests are accepted
+        
+        Reuses still-valid cookies saved by a previous run (checked against the
+        server) before falling back to a SignIn POST
+        
+        Returns:
+            bool: True if the session is authenticated
+        """
+        if not self.platform_user or not self.platform_password:
+            log.warning("⚠️ CEDROTECH_PLATAFORM / CEDROTECH_PLAT_PASSWORD not set - live quotes unavailable")
+            return False
+        
+        if restore_session_cookies(self.session, self.platform_user, self.base_url):
+            log.info("♻️  Reusing saved session cookies")
+            self.authenticated = True
+            return True
+        
         try:
-            # Make the API call
-            url = f"{self.base_url}/services/negotiation/sendNewOrderSingleLimit"
+            response = self.session.post(f"{self.base_url}/SignIn", headers={'accept': 'application/json'},
+                                         params={'login': self.platform_user, 'password': self.platform_password})
+        except RequestException as e:
+            log.error("❌ Authentication error: %s", e)
+            return False
+        
+        if response.status_code == 200 and dict(self.session.cookies):
+            log.info("✅ Authentication successful!")
+            self.authenticated = True
+            save_session_cookies(self.session, self.platform_user)
+            return True
+        
+        log.error("❌ Authentication failed: HTTP %s", response.status_code)
+        return False
+    
+    def _reauthenticate(self, generation: int) -> bool:
+        """
+        Replace session cookies the server rejected with a 401 by signing in again
+        
+        Args:
+            generation: Value of _auth_generation when the rejected request was sent
             
-            print(f"🌐 Sending order to CedroTech...")
-            print(f"   URL: {url}")
-            print(f"   Market: {order_params['market']}")
-            print(f"   Strategy: {order_params['orderstrategy']}")
+        Returns:
+            bool: True if the session was renewed (here or by a concurrent lookup) and the request can be retried
+        """
+        with self._auth_lock:
+            if self._auth_generation != generation:
+                # Another thread already signed in again after the same 401
+                return self.authenticated
             
-            response = requests.post(url, data=order_params, headers=headers)
+            # Saved cookies expired server-side - drop them so authenticate() does a real SignIn
+            clear_session_cookies(self.session, self.platform_user)
+            self.authenticated = False
+            self._auth_generation += 1
+            return self.authenticate()
+    
+    def warmup(self, connections: int = 1) -> bool:
+        """
+        Open (or refresh) pooled connections to CedroTech ahead of trading
+        
+        Pays DNS + TCP + TLS setup here so the first real orders reuse live
+        connections. Never run by the constructor - live-trading callers invoke
+        it explicitly, and again right before an expected trading window.
+        Orders go over HTTP/1.1 (one in flight per connection), so warm as many
+        connections as the largest basket place_orders will send in parallel
+        
+        Args:
+            connections: Number of connections to open concurrently
             
-            if response.status_code == 200:
-                result = response.json()
-                
-                print(f"✅ ORDER SENT SUCCESSFULLY!")
-                print(f"   Response: {result}")
-                
-                return {
-                    'success': True,
-                    'order_id': result.get('orderId', 'Unknown'),
-                    'response': result,
-                    'timestamp': datetime.now().isoformat()
-                }
-            else:
-                print(f"❌ ORDER FAILED!")
-                print(f"   Status Code: {response.status_code}")
-                print(f"   Response: {response.text}")
-                
-                return {
-                    'success': False,
-                    'error': f"HTTP {response.status_code}: {response.text}",
-                    'timestamp': datetime.now().isoformat()
-                }
-                
-        except Exception as e:
-            print(f"❌ API ERROR: {e}")
-            return {
-                'success': False,
-                'error': str(e),
-                'timestamp': datetime.now().isoformat()
-            }
-      
-    def place_sell_order(self, symbol: str, quantity: int, price: float) -> Dict:
+        Returns:
+            bool: True if the server answered on every connection
         """
-        Place a real SELL order through CedroTech API
+        started = time.perf_counter_ns()
+        if connections <= 1:
+            ok = self._warm_connection()
+        else:
+            # Concurrent HEADs can't share a socket, so each one opens its own
+            with ThreadPoolExecutor(max_workers=connections) as executor:
+                futures = [executor.submit(self._warm_connection) for _ in range(connections)]
+                ok = all([future.result() for future in futures])
+        
+        log.debug("Warmed %d connection(s) in %.1f ms", connections, (time.perf_counter_ns() - started) / 1e6)
+        return ok
+    
+    def _warm_connection(self) -> bool:
+        """HEAD the base URL once; True if the server answered"""
+        try:
+            self.session.head(self.base_url, timeout=WARMUP_TIMEOUT)
+        except RequestException as e:
+            log.debug("Connection warmup failed: %s", e)
+            return False
+        return True
+    
+    def _send_order(self, side: str, symbol: str, quantity: int, price: float) -> Dict:
+        """
+        Send a limit order through CedroTech API (shared by the BUY and SELL paths)
         WARNING: This uses REAL MONEY!
         
         Based on CedroTech API Documentation:
         https://docs.cedrotech.com/reference/post_services-negotiation-sendnewordersinglelimit
+        
+        The documented negotiation API is REST only, so orders are POSTed over the
+        shared keep-alive session rather than a WebSocket trade channel
         """
-        print(f"🔥 PLACING REAL SELL ORDER:")
-        print(f"   Symbol: {symbol}")
-        print(f"   Quantity: {quantity}")
-        print(f"   Price: R${price:.2f}")
-        print(f"   Total: R${price * quantity:.2f}")
+        log.info("🔥 PLACING REAL %s ORDER: %s x%s @ R$%.2f (total R$%.2f)",
+                 side, symbol, quantity, price, price * quantity)
         
-        # Prepare order parameters according to CedroTech API spec
-        order_params = {
-            # Required parameters
-            'market': 'XBSP',  # Bovespa market code
-            'price': str(f"{price:.2f}"),  # Price as string with 2 decimals
+        # One timestamp shared by ordertag and clordid
+        ts = time.strftime("%Y%m%d_%H%M%S")
+        
+        # Invariant fields come pre-encoded; only the per-order ones are encoded here
+        order_body = self._base_order_body + b'&' + urlencode({
+            'price': f"{price:.2f}",  # Price as string with 2 decimals
             'quote': symbol,  # Stock symbol (e.g., 'PETR4')
             'qtd': str(quantity),  # Quantity as string
-            'type': 'Limited',  # Order type - exactly as documented
-            'side': 'SELL',  # Order direction
-            'username': self.username,  # User's login username
-            'account': self.account,  # Account number
-            'sourceaddress': 'TRADING_ROBOT',  # Source identifier
-            
-            # Optional but recommended parameters
-            'orderstrategy': 'DAYTRADE',  # Day trade strategy
-            'timeinforce': 'DAY',  # Valid for the trading day
-            'ordertag': f'IRAN_ISRAEL_SELL_{datetime.now().strftime("%Y%m%d_%H%M%S")}',
-            'appname': 'GEOPOLITICAL_TRADING_BOT',
-            'clordid': f'PETR4_SELL_{datetime.now().strftime("%Y%m%d_%H%M%S")}'
-        }
+            'side': side,  # Order direction
+            'ordertag': f'{ORDER_TAG_PREFIXES[side]}_{ts}',
+            'clordid': f'PETR4_{side}_{ts}_{next(_CLORDID_SEQ)}'
+        }).encode()
         
-        # Headers according to documentation
-        headers = {
-            'user-identifier': self.user_identifier,  # Required header
-            'accept': 'application/json',  # Accept JSON response
-            'Content-Type': 'application/x-www-form-urlencoded'
-        }
+        return self._post_order(side, order_body)
+    
+    def _post_order(self, side: str, order_body: bytes) -> Dict:
+        """
+        POST an encoded order and turn the outcome into the order result dict
+        
+        Returns:
+            {'success': True, 'order_id', 'response', 'timestamp'} or
+            {'success': False, 'error', 'timestamp'}
+        """
+        log.debug("🌐 Sending %s order to %s (market %s, strategy %s)",
+                  side, self._order_url, self._base_order_params['market'], self._base_order_params['orderstrategy'])
         
+        started = time.perf_counter_ns()
         try:
-            # Make the API call
-            url = f"{self.base_url}/services/negotiation/sendNewOrderSingleLimit"
-            
-            print(f"🌐 Sending SELL order to CedroTech...")
-            print(f"   URL: {url}")
-            print(f"   Market: {order_params['market']}")
-            print(f"   Strategy: {order_params['orderstrategy']}")
-            
-            response = requests.post(url, data=order_params, headers=headers)
+            response = self.session.post(self._order_url, data=order_body, headers=self._order_headers, timeout=ORDER_TIMEOUT)
+        except Exception as e:
+            log.error("❌ %s order API error: %s", side, e)
+            error = str(e)
+        else:
+            log.info("   %s order round-trip: %.1f ms (HTTP %s)",
+                     side, (time.perf_counter_ns() - started) / 1e6, response.status_code)
             
             if response.status_code == 200:
-                result = response.json()
+                log.info("✅ %s ORDER SENT SUCCESSFULLY!", side)
+                
+                # A 200 means the order was accepted - an ack body we can't parse as a
+                # JSON object must not turn that into a reported failure
+                try:
+                    result = orjson.loads(response.content)
+                except orjson.JSONDecodeError:
+                    result = None
+                
+                if type(result) is dict:
+                    order_id = result.get('orderId', 'Unknown')
+                else:
+                    match = _ORDER_ID_RE.search(response.content)
+                    order_id = match.group(1).decode() if match else 'Unknown'
+                    result = response.text
                 
-                print(f"✅ SELL ORDER SENT SUCCESSFULLY!")
-                print(f"   Response: {result}")
+                log.debug("   Response: %s", result)
                 
                 return {
                     'success': True,
-                    'order_id': result.get('orderId', 'Unknown'),
+                    'order_id': order_id,
                     'response': result,
                     'timestamp': datetime.now().isoformat()
                 }
-            else:
-                print(f"❌ SELL ORDER FAILED!")
-                print(f"   Status Code: {response.status_code}")
-                print(f"   Response: {response.text}")
-                
-                return {
-                    'success': False,
-                    'error': f"HTTP {response.status_code}: {response.text}",
-                    'timestamp': datetime.now().isoformat()
-                }
-                
-        except Exception as e:
-            print(f"❌ SELL order API error: {e}")
-            return {
-                'success': False,
-                'error': str(e),
-                'timestamp': datetime.now().isoformat()
-            }
+            
+            log.error("❌ %s ORDER FAILED! HTTP %s: %s", side, response.status_code, response.text)
+            error = f"HTTP {response.status_code}: {response.text}"
+        
+        return {
+            'success': False,
+            'error': error,
+            'timestamp': datetime.now().isoformat()
+        }
+    
+    def place_buy_order(self, symbol: str, quantity: int, price: float) -> Dict:
+        """
+        Place a real BUY order through CedroTech API
+        WARNING: This uses REAL MONEY!
+        """
+        return self._send_order('BUY', symbol, quantity, price)
+      
+    def place_sell_order(self, symbol: str, quantity: int, price: float) -> Dict:
+        """
+        Place a real SELL order through CedroTech API
+        WARNING: This uses REAL MONEY!
+        """
+        return self._send_order('SELL', symbol, quantity, price)
+    
+    def submit_buy_async(self, symbol: str, quantity: int, price: float) -> Future:
+        """
+        Send a real BUY order in the background and return at once
+        WARNING: This uses REAL MONEY!
+        
+        Returns:
+            Future resolving to the same result dict as place_buy_order
+        """
+        return self._order_executor.submit(self._send_order, 'BUY', symbol, quantity, price)
+    
+    def submit_sell_async(self, symbol: str, quantity: int, price: float) -> Future:
+        """
+        Send a real SELL order in the background and return at once
+        WARNING: This uses REAL MONEY!
+        
+        Returns:
+            Future resolving to the same result dict as place_sell_order
+        """
+        return self._order_executor.submit(self._send_order, 'SELL', symbol, quantity, price)
+    
+    def place_orders(self, orders: List[Tuple[str, str, int, float]], max_workers: int = 8) -> List[Dict]:
+        """
+        Place a basket of real orders concurrently through CedroTech API
+        WARNING: This uses REAL MONEY!
+        
+        CedroTech has no documented batch order endpoint, so each order is still
+        its own POST; they are just sent in parallel instead of back to back
+        
+        Args:
+            orders: (side, symbol, quantity, price) tuples, side being 'BUY' or 'SELL'
+            max_workers: Maximum orders in flight at once
+            
+        Returns:
+            List of order results, in the same order as `orders`
+        """
+        if not orders:
+            return []
+        
+        # Each order is one independent round-trip - overlap them on the pooled session
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(orders))) as executor:
+            futures = [executor.submit(self._send_order, *order) for order in orders]
+            return [future.result() for future in futures]
     
     def get_current_quote(self, symbol: str) -> Optional[float]:
-        """Get current market quote for symbol"""
+        """
+        Get current market quote (last trade price) for symbol
+        
+        Signs the session in on first use and once more if the server answers 401
+        
+        Returns None when the quote can't be fetched - never a made-up price
+        """
+        cached = self._quote_cache.get(symbol)
+        if cached is not None and cached[0] > time.monotonic():
+            return cached[1]
+        
+        if not self.authenticated:
+            with self._auth_lock:
+                if not self.authenticated and not self.authenticate():
+                    return None
+        
+        url = f"{self.base_url}/services/quotes/quote/{symbol}"
         try:
-            # This would use the quote API
-            # For now, return estimated price
-            return 30.50  # Fallback price
-        except:
-            return 30.50
+            generation = self._auth_generation
+            response = self.session.get(url, headers={'accept': 'application/json'}, timeout=QUOTE_TIMEOUT)
+            if response.status_code == 401 and self._reauthenticate(generation):
+                # Expired session: sign in again once and retry with the fresh cookies
+                response = self.session.get(url, headers={'accept': 'application/json'}, timeout=QUOTE_TIMEOUT)
+            
+            if response.status_code != 200:
+                if response.status_code == 401:
+                    # Still rejected after a fresh SignIn - force another one next time
+                    clear_session_cookies(self.session, self.platform_user)
+                    self.authenticated = False
+                log.warning("⚠️ Quote for %s failed: HTTP %s", symbol, response.status_code)
+                return None
+            
+            data = orjson.loads(response.content)
+            price = float(data.get('lastTrade', data.get('last', data.get('price'))))
+        except (RequestException, AttributeError, TypeError, ValueError) as e:
+            log.warning("⚠️ Quote for %s failed: %s", symbol, e)
+            return None
+        
+        # No trade yet (pre-open, or an untraded symbol) comes back as 0 - not a price
+        if price <= 0:
+            log.warning("⚠️ Quote for %s has no valid price: %s", symbol, price)
+            return None
+        
+        self._quote_cache[symbol] = (time.monotonic() + QUOTE_TTL, price)
+        return price
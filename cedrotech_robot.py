@@ -4,14 +4,16 @@ New robot using CedroTech API with combined fundamental + technical analysis
 Separate from the original BrAPI robot - uses enhanced signal generation
 """
 
-import json
+import logging
+import orjson
 import time
-import requests
-from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Tuple
+import threading
+from datetime import datetime, timedelta, time as dt_time
+from typing import Dict, Iterator, List, Optional, Tuple
 import traceback
 import os
 import sys
+from concurrent.futures import ThreadPoolExecutor
 
 # Add the current directory to path for imports
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
@@ -21,22 +23,49 @@ from enhanced_day_trading_signals import enhanced_day_trading_signal
 from utils.quick_technical_analysis import get_price_signals
 from cedrotech_real_api import CedroTechRealAPI
 
+log = logging.getLogger(__name__)
+
 class CedroTechTradingRobot:
     """
     ENHANCED TRADING ROBOT using CedroTech API
     Combines fundamental + technical analysis for superior signal generation
     """
+    
+    # Seconds an analysis is reused while the market is open; while it's closed
+    # quotes can't move, so one analysis is reused until the market opens
+    ANALYSIS_TTL = 60
+    
+    # Brazilian market hours: 10:00 - 17:30 (BRT), Monday-Friday
+    MARKET_OPEN = dt_time(10, 0)
+    MARKET_CLOSE = dt_time(17, 30)
+    
+    # Reasonable defaults for Brazilian stocks, used only when no live quote is available
+    REFERENCE_PRICES = {
+        'PETR4': 25.50,
+        'VALE3': 62.30,
+        'ITUB4': 32.10,
+        'BBDC4': 14.80,
+        'ABEV3': 11.90,
+        'AMER3': 28.40,
+        'MGLU3': 8.50,
+        'LREN3': 45.20,
+        'RENT3': 58.70,
+        'EMBR3': 22.10
+    }
     def __init__(self):
         # Robot identification
         self.robot_name = "CedroTech Enhanced Robot"
         self.version = "1.0.0"
         
-        # Initialize CedroTech Real API
+        # Initialize CedroTech Real API (orders and quotes go over the process-wide
+        # keep-alive session, already warmed by the constructor)
         self.real_api = CedroTechRealAPI()
         self.use_real_trading = True  # Set to False for simulation mode
         
         # State management
         self.state_file = "cedrotech_robot_state.json"
+        self.trade_log_file = "cedrotech_trading_log.jsonl"  # one JSON trade record per line
+        self.legacy_trade_log_file = "cedrotech_trading_log.json"  # old {'trades': [...]} format
         self.current_asset = None
         self.current_position = None
         self.last_analysis_time = None
@@ -57,33 +86,54 @@ class CedroTechTradingRobot:
         self.total_profit_loss = 0.0
         self.last_signal_strength = 0.0
         
+        # (expires_at, market_open, (results, all_signals)) from the last enhanced_robot_analysis()
+        self._analysis_cache = None
+        
+        # ISO timestamp of the analysis cycle in progress (None outside run_analysis_cycle)
+        self._cycle_time = None
+        
+        # Set by stop() to end run_continuous / run_continuous_monitoring without waiting out the interval
+        self._stop_event = threading.Event()
+        
+        # Persistent fields as of the last successful save_robot_state()
+        self._saved_state_key = None
+        
         # Load existing state
         self.load_robot_state()
     
     def load_robot_state(self):
         """Load robot state from file"""
         try:
-            if os.path.exists(self.state_file):
-                with open(self.state_file, 'r') as f:
-                    state = json.load(f)
-                
-                self.current_asset = state.get('current_asset')
-                self.current_position = state.get('current_position')
-                self.last_analysis_time = state.get('last_analysis_time')
-                self.trades_executed = state.get('trades_executed', 0)
-                self.total_profit_loss = state.get('total_profit_loss', 0.0)
-                
-                print(f"🔄 LOADED STATE:")
-                print(f"   Current Asset: {self.current_asset}")
-                print(f"   Position: {self.current_position}")
-                print(f"   Trades Executed: {self.trades_executed}")
-                
+            with open(self.state_file, 'rb') as f:
+                state = orjson.loads(f.read())
+            
+            self.current_asset = state.get('current_asset')
+            self.current_position = state.get('current_position')
+            self.last_analysis_time = state.get('last_analysis_time')
+            self.trades_executed = state.get('trades_executed', 0)
+            self.total_profit_loss = state.get('total_profit_loss', 0.0)
+            
+            log.info("🔄 LOADED STATE:")
+            log.info("   Current Asset: %s", self.current_asset)
+            log.info("   Position: %s", self.current_position)
+            log.info("   Trades Executed: %s", self.trades_executed)
+            
+        except FileNotFoundError:
+            # First run - keep the defaults set in __init__
+            pass
         except Exception as e:
-            print(f"⚠️  Could not load state: {e}")
+            log.warning("⚠️  Could not load state: %s", e)
             self.initialize_default_state()
     
     def save_robot_state(self):
-        """Save current robot state"""
+        """Save current robot state (skipped when nothing but the timestamps changed)"""
+        # Position, trade count, P&L and signal strength - the fields a restart needs.
+        # Most cycles are HOLDs that only move last_analysis_time, not worth a fsync'd write
+        state_key = (self.current_asset, self.current_position, self.trades_executed,
+                     self.total_profit_loss, self.last_signal_strength)
+        if state_key == self._saved_state_key:
+            return
+        
         try:
             state = {
                 'robot_name': self.robot_name,
@@ -93,15 +143,22 @@ class CedroTechTradingRobot:
                 'last_analysis_time': self.last_analysis_time,
                 'trades_executed': self.trades_executed,
                 'total_profit_loss': self.total_profit_loss,
-                'last_update': datetime.now().isoformat(),
+                'last_update': self._cycle_time or datetime.now().isoformat(),
                 'last_signal_strength': self.last_signal_strength
             }
             
-            with open(self.state_file, 'w') as f:
-                json.dump(state, f, indent=2)
+            # Write a temp file and rename it over the state file, so a crash mid-write
+            # leaves the previous state intact instead of a truncated JSON file
+            tmp_file = self.state_file + ".tmp"
+            with open(tmp_file, 'wb') as f:
+                f.write(orjson.dumps(state, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY))
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_file, self.state_file)
+            self._saved_state_key = state_key
                 
         except Exception as e:
-            print(f"⚠️  Could not save state: {e}")
+            log.warning("⚠️  Could not save state: %s", e)
     
     def initialize_default_state(self):
         """Initialize robot with default state"""
@@ -111,29 +168,33 @@ class CedroTechTradingRobot:
         self.total_profit_loss = 0.0
         self.last_analysis_time = None
         
-        print("🆕 INITIALIZED DEFAULT STATE")
+        log.info("🆕 INITIALIZED DEFAULT STATE")
     
     def run_analysis_cycle(self) -> Dict:
         """
         Run a complete analysis cycle using enhanced combined signals
         Returns trading opportunities and recommendations
         """
-        print(f"\n🤖 {self.robot_name.upper()} - ANALYSIS CYCLE")
-        print("=" * 80)
-        print(f"🕐 {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+        log.info("\n🤖 %s - ANALYSIS CYCLE", self.robot_name.upper())
+        log.info("=" * 80)
+        
+        # One clock read per cycle, shared by the decision and the saved state
+        cycle_now = datetime.now()
+        self._cycle_time = cycle_now.isoformat()
+        log.info("🕐 %s", cycle_now.strftime('%Y-%m-%d %H:%M:%S'))
         
         try:
             # Run enhanced analysis using our proven system
-            results, all_signals = enhanced_robot_analysis()
+            results, all_signals = self.get_enhanced_analysis()
             
             # Update analysis time
-            self.last_analysis_time = datetime.now().isoformat()
+            self.last_analysis_time = self._cycle_time
             
             # Identify trading opportunities
             recommended_asset = self.evaluate_trading_opportunities(results)
             
             # Make trading decision
-            trading_action = self.make_trading_decision(results, recommended_asset)
+            trading_action = self.make_trading_decision(results, recommended_asset, self.build_signal_index(results))
             
             # Save state
             self.save_robot_state()
@@ -146,44 +207,61 @@ class CedroTechTradingRobot:
             }
             
         except Exception as e:
-            print(f"❌ ANALYSIS CYCLE ERROR: {e}")
+            log.error("❌ ANALYSIS CYCLE ERROR: %s", e)
             traceback.print_exc()
             return {'error': str(e)}
+        
+        finally:
+            self._cycle_time = None
+    
+    def get_enhanced_analysis(self) -> Tuple[Dict, List[Dict]]:
+        """
+        enhanced_robot_analysis() with a TTL cache, so back-to-back cycles
+        (or closed-market cycles) don't recompute the whole asset universe
+        """
+        market_open = self.is_market_open()
+        cached = self._analysis_cache
+        if cached is not None and cached[1] == market_open and (not market_open or cached[0] > time.monotonic()):
+            log.info("♻️  Reusing recent analysis (inputs unchanged)")
+            return cached[2]
+        
+        analysis = enhanced_robot_analysis(self.asset_universe)
+        self._analysis_cache = (time.monotonic() + self.ANALYSIS_TTL, market_open, analysis)
+        return analysis
     
     def evaluate_trading_opportunities(self, results: Dict) -> Optional[str]:
         """
         Evaluate trading opportunities from analysis results
         Returns the best asset to trade or None
         """
-        print(f"\n🔍 EVALUATING TRADING OPPORTUNITIES")
-        print("-" * 50)
+        log.info("\n🔍 EVALUATING TRADING OPPORTUNITIES")
+        log.info("-" * 50)
         
         # Check for STRONG_BUY signals first
         if results['strong_buy']:
             top_signal = results['strong_buy'][0]
             self.last_signal_strength = top_signal['confidence']
             
-            print(f"🚀 STRONG_BUY OPPORTUNITY FOUND!")
-            print(f"   Asset: {top_signal['ticker']}")
-            print(f"   Confidence: {top_signal['confidence']:.1f}%")
-            print(f"   Agreement: {top_signal['agreement']}")
+            log.info("🚀 STRONG_BUY OPPORTUNITY FOUND!")
+            log.info("   Asset: %s", top_signal['ticker'])
+            log.info("   Confidence: %.1f%%", top_signal['confidence'])
+            log.info("   Agreement: %s", top_signal['agreement'])
             
             return top_signal['ticker']
         
         # Check for BUY signals above threshold
-        high_confidence_buys = [
-            signal for signal in results['buy'] 
-            if signal['confidence'] >= self.confidence_threshold
-        ]
+        top_signal = next(
+            (signal for signal in results['buy'] if signal['confidence'] >= self.confidence_threshold),
+            None
+        )
         
-        if high_confidence_buys:
-            top_signal = high_confidence_buys[0]
+        if top_signal is not None:
             self.last_signal_strength = top_signal['confidence']
             
-            print(f"📈 HIGH-CONFIDENCE BUY OPPORTUNITY!")
-            print(f"   Asset: {top_signal['ticker']}")
-            print(f"   Confidence: {top_signal['confidence']:.1f}%")
-            print(f"   Agreement: {top_signal['agreement']}")
+            log.info("📈 HIGH-CONFIDENCE BUY OPPORTUNITY!")
+            log.info("   Asset: %s", top_signal['ticker'])
+            log.info("   Confidence: %.1f%%", top_signal['confidence'])
+            log.info("   Agreement: %s", top_signal['agreement'])
             
             return top_signal['ticker']
         
@@ -192,64 +270,68 @@ class CedroTechTradingRobot:
             top_signal = results['buy'][0]
             self.last_signal_strength = top_signal['confidence']
             
-            print(f"📊 MODERATE BUY OPPORTUNITY")
-            print(f"   Asset: {top_signal['ticker']}")
-            print(f"   Confidence: {top_signal['confidence']:.1f}%")
-            print(f"   Note: Below high-confidence threshold")
+            log.info("📊 MODERATE BUY OPPORTUNITY")
+            log.info("   Asset: %s", top_signal['ticker'])
+            log.info("   Confidence: %.1f%%", top_signal['confidence'])
+            log.info("   Note: Below high-confidence threshold")
             
             return top_signal['ticker']
         
-        print("⏸️  NO STRONG TRADING OPPORTUNITIES")
-        print("   Waiting for better signals...")
+        log.info("⏸️  NO STRONG TRADING OPPORTUNITIES")
+        log.info("   Waiting for better signals...")
         
         return None
     
-    def make_trading_decision(self, results: Dict, recommended_asset: Optional[str]) -> Dict:
+    def build_signal_index(self, results: Dict) -> Dict[str, Dict]:
+        """Map ticker -> signal over the BUY categories (a STRONG_BUY wins over a BUY)"""
+        index = {signal['ticker']: signal for signal in results.get('buy', [])}
+        index.update((signal['ticker'], signal) for signal in results.get('strong_buy', []))
+        return index
+    
+    def make_trading_decision(self, results: Dict, recommended_asset: Optional[str],
+                              signal_index: Optional[Dict[str, Dict]] = None) -> Dict:
         """
         Make final trading decision based on analysis
+        
+        signal_index: build_signal_index(results), if the caller already has it
         """
-        print(f"\n🎯 MAKING TRADING DECISION")
-        print("-" * 40)
+        log.info("\n🎯 MAKING TRADING DECISION")
+        log.info("-" * 40)
         
         trading_action = {
             'action': 'HOLD',
             'asset': self.current_asset,
             'reason': 'No strong signals',
             'confidence': 0.0,
-            'timestamp': datetime.now().isoformat()
+            'timestamp': self._cycle_time or datetime.now().isoformat()
         }
         
         # If no asset recommended, hold current position
         if not recommended_asset:
             if self.current_asset:
-                print(f"⏸️  HOLDING CURRENT POSITION: {self.current_asset}")
+                log.info("⏸️  HOLDING CURRENT POSITION: %s", self.current_asset)
                 trading_action['reason'] = 'Waiting for stronger signals'
             else:
-                print("⏸️  NO POSITION - WAITING FOR OPPORTUNITY")
+                log.info("⏸️  NO POSITION - WAITING FOR OPPORTUNITY")
                 trading_action['reason'] = 'No trading opportunity identified'
             
             return trading_action
         
         # Get signal details for recommended asset
-        recommended_signal = None
-        for category in ['strong_buy', 'buy']:
-            for signal in results.get(category, []):
-                if signal['ticker'] == recommended_asset:
-                    recommended_signal = signal
-                    break
-            if recommended_signal:
-                break
+        if signal_index is None:
+            signal_index = self.build_signal_index(results)
+        recommended_signal = signal_index.get(recommended_asset)
         
         if not recommended_signal:
-            print("❌ ERROR: Could not find signal for recommended asset")
+            log.error("❌ ERROR: Could not find signal for recommended asset")
             return trading_action
         
         # Decision logic
         if self.current_asset == recommended_asset:
             # Already holding the recommended asset
-            print(f"✅ CONTINUING TO HOLD: {recommended_asset}")
-            print(f"   Reason: Already holding the best opportunity")
-            print(f"   Signal Strength: {recommended_signal['confidence']:.1f}%")
+            log.info("✅ CONTINUING TO HOLD: %s", recommended_asset)
+            log.info("   Reason: Already holding the best opportunity")
+            log.info("   Signal Strength: %.1f%%", recommended_signal['confidence'])
             
             trading_action.update({
                 'action': 'HOLD',
@@ -260,11 +342,11 @@ class CedroTechTradingRobot:
             
         elif self.current_asset and self.current_asset != recommended_asset:
             # Switch from current asset to recommended asset
-            print(f"🔄 SWITCHING ASSETS!")
-            print(f"   FROM: {self.current_asset}")
-            print(f"   TO: {recommended_asset}")
-            print(f"   Reason: Better opportunity identified")
-            print(f"   New Signal Strength: {recommended_signal['confidence']:.1f}%")
+            log.info("🔄 SWITCHING ASSETS!")
+            log.info("   FROM: %s", self.current_asset)
+            log.info("   TO: %s", recommended_asset)
+            log.info("   Reason: Better opportunity identified")
+            log.info("   New Signal Strength: %.1f%%", recommended_signal['confidence'])
             
             # Simulate selling current and buying new
             self.execute_asset_switch(self.current_asset, recommended_asset, recommended_signal)
@@ -281,10 +363,10 @@ class CedroTechTradingRobot:
             
         else:
             # No current position, enter new position
-            print(f"🚀 ENTERING NEW POSITION: {recommended_asset}")
-            print(f"   Signal: {recommended_signal['signal']}")
-            print(f"   Confidence: {recommended_signal['confidence']:.1f}%")
-            print(f"   Agreement: {recommended_signal['agreement']}")
+            log.info("🚀 ENTERING NEW POSITION: %s", recommended_asset)
+            log.info("   Signal: %s", recommended_signal['signal'])
+            log.info("   Confidence: %.1f%%", recommended_signal['confidence'])
+            log.info("   Agreement: %s", recommended_signal['agreement'])
             
             self.execute_buy_trade(recommended_asset, recommended_signal)
             
@@ -301,11 +383,11 @@ class CedroTechTradingRobot:
     
     def execute_buy_trade(self, asset: str, signal: Dict):
         """Execute a buy trade using CedroTech Real API"""
-        print(f"\n💰 EXECUTING BUY TRADE")
-        print(f"   Asset: {asset}")
-        print(f"   Signal: {signal['signal']}")
-        print(f"   Confidence: {signal['confidence']:.1f}%")
-        print(f"   Mode: {'REAL MONEY' if self.use_real_trading else 'SIMULATION'}")
+        log.info("\n💰 EXECUTING BUY TRADE")
+        log.info("   Asset: %s", asset)
+        log.info("   Signal: %s", signal['signal'])
+        log.info("   Confidence: %.1f%%", signal['confidence'])
+        log.info("   Mode: %s", 'REAL MONEY' if self.use_real_trading else 'SIMULATION')
         
         success = False
         order_id = None
@@ -320,9 +402,9 @@ class CedroTechTradingRobot:
                   # Get current market price
                 market_price = self.get_market_price(asset)
                 
-                print(f"   Quantity: {quantity} shares")
-                print(f"   Market Price: R${market_price:.2f}")
-                print(f"   Total Value: R${market_price * quantity:.2f}")
+                log.info("   Quantity: %s shares", quantity)
+                log.info("   Market Price: R$%.2f", market_price)
+                log.info("   Total Value: R$%.2f", market_price * quantity)
                 
                 # Execute real buy order
                 response = self.real_api.place_buy_order(
@@ -334,20 +416,20 @@ class CedroTechTradingRobot:
                 if response and response.get('success'):
                     success = True
                     order_id = response.get('order_id')
-                    print(f"✅ REAL ORDER PLACED SUCCESSFULLY!")
-                    print(f"   Order ID: {order_id}")
-                    print(f"   Quantity: {quantity}")
+                    log.info("✅ REAL ORDER PLACED SUCCESSFULLY!")
+                    log.info("   Order ID: %s", order_id)
+                    log.info("   Quantity: %s", quantity)
                 else:
-                    print(f"❌ REAL ORDER FAILED: {response.get('error', 'Unknown error')}")
-                    print("   Falling back to simulation mode...")
+                    log.error("❌ REAL ORDER FAILED: %s", response.get('error', 'Unknown error'))
+                    log.info("   Falling back to simulation mode...")
                     
             except Exception as e:
-                print(f"❌ REAL TRADING ERROR: {e}")
-                print("   Falling back to simulation mode...")
+                log.error("❌ REAL TRADING ERROR: %s", e)
+                log.info("   Falling back to simulation mode...")
         
         if not success:
             # Simulation mode or fallback
-            print(f"📊 SIMULATED BUY TRADE")
+            log.info("📊 SIMULATED BUY TRADE")
             success = True  # Simulation always "succeeds"
         
         # Update robot state
@@ -369,18 +451,18 @@ class CedroTechTradingRobot:
         # Log trade
         self.log_trade(trade_record)
         
-        print(f"✅ TRADE EXECUTED SUCCESSFULLY!")
-        print(f"   Trade #: {self.trades_executed}")
-        print(f"   Position: {self.current_position}")
+        log.info("✅ TRADE EXECUTED SUCCESSFULLY!")
+        log.info("   Trade #: %s", self.trades_executed)
+        log.info("   Position: %s", self.current_position)
         
         return success
       
     def execute_asset_switch(self, from_asset: str, to_asset: str, new_signal: Dict):
         """Execute asset switch (sell old, buy new) using real API"""
-        print(f"\n🔄 EXECUTING ASSET SWITCH")
-        print(f"   Selling: {from_asset}")
-        print(f"   Buying: {to_asset}")
-        print(f"   Mode: {'REAL MONEY' if self.use_real_trading else 'SIMULATION'}")
+        log.info("\n🔄 EXECUTING ASSET SWITCH")
+        log.info("   Selling: %s", from_asset)
+        log.info("   Buying: %s", to_asset)
+        log.info("   Mode: %s", 'REAL MONEY' if self.use_real_trading else 'SIMULATION')
         
         sell_success = False
         buy_success = False
@@ -389,11 +471,13 @@ class CedroTechTradingRobot:
             try:
                 # First, sell the current position
                 quantity = 100  # Should track actual position size
-                from_price = self.get_market_price(from_asset)
-                to_price = self.get_market_price(to_asset)
                 
-                print(f"   Sell {from_asset} at R${from_price:.2f}")
-                print(f"   Buy {to_asset} at R${to_price:.2f}")
+                # Both quotes are needed before the sell goes out - fetch them together
+                with ThreadPoolExecutor(max_workers=2) as executor:
+                    from_price, to_price = executor.map(self.get_market_price, (from_asset, to_asset))
+                
+                log.info("   Sell %s at R$%.2f", from_asset, from_price)
+                log.info("   Buy %s at R$%.2f", to_asset, to_price)
                 
                 sell_response = self.real_api.place_sell_order(
                     symbol=from_asset,
@@ -403,8 +487,9 @@ class CedroTechTradingRobot:
                 
                 if sell_response and sell_response.get('success'):
                     sell_success = True
-                    print(f"✅ SELL ORDER PLACED: {from_asset}")
-                      # Then buy the new asset
+                    log.info("✅ SELL ORDER PLACED: %s", from_asset)
+                    # Then buy the new asset - only once the sell is confirmed,
+                    # so a failed sell never leaves us holding both positions
                     buy_response = self.real_api.place_buy_order(
                         symbol=to_asset,
                         quantity=quantity,
@@ -413,19 +498,19 @@ class CedroTechTradingRobot:
                     
                     if buy_response and buy_response.get('success'):
                         buy_success = True
-                        print(f"✅ BUY ORDER PLACED: {to_asset}")
+                        log.info("✅ BUY ORDER PLACED: %s", to_asset)
                     else:
-                        print(f"❌ BUY ORDER FAILED: {buy_response.get('error', 'Unknown error')}")
+                        log.error("❌ BUY ORDER FAILED: %s", buy_response.get('error', 'Unknown error'))
                 else:
-                    print(f"❌ SELL ORDER FAILED: {sell_response.get('error', 'Unknown error')}")
+                    log.error("❌ SELL ORDER FAILED: %s", sell_response.get('error', 'Unknown error'))
                     
             except Exception as e:
-                print(f"❌ ASSET SWITCH ERROR: {e}")
-                print("   Falling back to simulation mode...")
+                log.error("❌ ASSET SWITCH ERROR: %s", e)
+                log.info("   Falling back to simulation mode...")
         
         if not (sell_success and buy_success):
             # Simulation mode or fallback
-            print(f"📊 SIMULATED ASSET SWITCH")
+            log.info("📊 SIMULATED ASSET SWITCH")
             sell_success = buy_success = True
         
         # Update robot state
@@ -445,33 +530,36 @@ class CedroTechTradingRobot:
         # Log switch
         self.log_trade(switch_record)
         
-        print(f"✅ ASSET SWITCH COMPLETED!")
-        print(f"   New Position: {to_asset}")
-        print(f"   Total Trades: {self.trades_executed}")
+        log.info("✅ ASSET SWITCH COMPLETED!")
+        log.info("   New Position: %s", to_asset)
+        log.info("   Total Trades: %s", self.trades_executed)
         
         return sell_success and buy_success
     
     def log_trade(self, trade_record: Dict):
-        """Log trade to file"""
+        """Log trade to file (appends one line - the existing log is never re-read)"""
         try:
-            log_file = "cedrotech_trading_log.json"
-            
-            # Load existing log
-            if os.path.exists(log_file):
-                with open(log_file, 'r') as f:
-                    log_data = json.load(f)
-            else:
-                log_data = {'trades': []}
-            
-            # Add new trade
-            log_data['trades'].append(trade_record)
-            
-            # Save updated log
-            with open(log_file, 'w') as f:
-                json.dump(log_data, f, indent=2)
+            with open(self.trade_log_file, 'ab') as f:
+                f.write(orjson.dumps(trade_record, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_APPEND_NEWLINE))
                 
         except Exception as e:
-            print(f"⚠️  Could not log trade: {e}")
+            log.warning("⚠️  Could not log trade: %s", e)
+    
+    def load_trades(self) -> Iterator[Dict]:
+        """Yield logged trades oldest first, including any from the legacy JSON log"""
+        try:
+            with open(self.legacy_trade_log_file, 'rb') as f:
+                yield from orjson.loads(f.read()).get('trades', [])
+        except FileNotFoundError:
+            pass
+        
+        try:
+            with open(self.trade_log_file, 'rb') as f:
+                for line in f:
+                    if line.strip():
+                        yield orjson.loads(line)
+        except FileNotFoundError:
+            pass
     
     def generate_performance_report(self) -> str:
         """Generate performance report"""
@@ -511,18 +599,19 @@ class CedroTechTradingRobot:
             continuous_mode: If True, runs indefinitely
             cycle_interval: Seconds between cycles (default 5 minutes)
         """
-        print(f"🚀 STARTING CEDROTECH ENHANCED ROBOT")
+        log.info("🚀 STARTING CEDROTECH ENHANCED ROBOT")
         
         if continuous_mode:
-            print(f"🔄 Running in CONTINUOUS MODE (every {cycle_interval} seconds)")
-            print("   Press Ctrl+C to stop")
+            log.info("🔄 Running in CONTINUOUS MODE (every %s seconds)", cycle_interval)
+            log.info("   Press Ctrl+C to stop")
         else:
-            print(f"🔄 Running {cycles} analysis cycle(s)")
+            log.info("🔄 Running %s analysis cycle(s)", cycles)
             
-        print("=" * 80)
+        log.info("=" * 80)
         
         cycle_count = 0
         start_time = datetime.now()
+        self._stop_event.clear()
         
         try:
             while True:
@@ -531,133 +620,160 @@ class CedroTechTradingRobot:
                 if not continuous_mode and cycle_count > cycles:
                     break
                 
-                print(f"\n🔄 CYCLE {cycle_count}" + (f" of {cycles}" if not continuous_mode else ""))
-                print(f"⏰ {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-                print("-" * 50)
+                log.info("\n🔄 CYCLE %s%s", cycle_count, "" if continuous_mode else f" of {cycles}")
+                log.info("⏰ %s", datetime.now().strftime('%Y-%m-%d %H:%M:%S'))
+                log.info("-" * 50)
                 
                 # Run analysis cycle
                 cycle_result = self.run_analysis_cycle()
                 
                 # Show results
-                if 'error' not in cycle_result:
+                if 'error' not in cycle_result and log.isEnabledFor(logging.INFO):
                     recommended_asset = cycle_result.get('recommended_asset')
                     trading_action = cycle_result.get('trading_action', {})
                     
-                    print(f"\n📋 CYCLE SUMMARY:")
-                    print(f"   Recommended Asset: {recommended_asset or 'None'}")
-                    print(f"   Action Taken: {trading_action.get('action', 'Unknown')}")
-                    print(f"   Current Asset: {self.current_asset or 'None'}")
-                    print(f"   Total Trades: {self.trades_executed}")
+                    log.info("\n📋 CYCLE SUMMARY:")
+                    log.info("   Recommended Asset: %s", recommended_asset or 'None')
+                    log.info("   Action Taken: %s", trading_action.get('action', 'Unknown'))
+                    log.info("   Current Asset: %s", self.current_asset or 'None')
+                    log.info("   Total Trades: %s", self.trades_executed)
                 
                 # Wait between cycles
                 if continuous_mode or (not continuous_mode and cycle_count < cycles):
                     next_cycle_time = datetime.now() + timedelta(seconds=cycle_interval)
-                    print(f"\n⏳ Next cycle at: {next_cycle_time.strftime('%H:%M:%S')}")
-                    print(f"   Waiting {cycle_interval} seconds...")
+                    log.info("\n⏳ Next cycle at: %s", next_cycle_time.strftime('%H:%M:%S'))
+                    log.info("   Waiting %s seconds...", cycle_interval)
                     
-                    # Sleep in smaller chunks to allow for interruption
-                    for i in range(cycle_interval):
-                        time.sleep(1)
-                        if i > 0 and i % 60 == 0:  # Show progress every minute
-                            remaining = cycle_interval - i
-                            print(f"   ⏱️  {remaining} seconds remaining...")
+                    # Show progress every minute
+                    if self.wait_for_next_cycle(cycle_interval, progress_every=60):
+                        log.info("\n🛑 ROBOT STOP REQUESTED")
+                        break
         
         except KeyboardInterrupt:
-            print(f"\n🛑 ROBOT STOPPED BY USER")
-            print(f"   Completed {cycle_count} cycles")
+            log.info("\n🛑 ROBOT STOPPED BY USER")
+            log.info("   Completed %s cycles", cycle_count)
             
         except Exception as e:
-            print(f"\n❌ ROBOT ERROR: {e}")
+            log.error("\n❌ ROBOT ERROR: %s", e)
             traceback.print_exc()
         
         finally:
             # Final report
             session_duration = datetime.now() - start_time
-            print(f"\n{self.generate_performance_report()}")
-            print(f"\n🏁 ROBOT SESSION ENDED")
-            print(f"   Total Cycles: {cycle_count}")
-            print(f"   Session Duration: {session_duration}")
-            print(f"   Average Cycle Time: {session_duration.total_seconds() / max(cycle_count, 1):.1f} seconds")
+            if log.isEnabledFor(logging.INFO):
+                log.info("\n%s", self.generate_performance_report())
+            log.info("\n🏁 ROBOT SESSION ENDED")
+            log.info("   Total Cycles: %s", cycle_count)
+            log.info("   Session Duration: %s", session_duration)
+            log.info("   Average Cycle Time: %.1f seconds", session_duration.total_seconds() / max(cycle_count, 1))
+    
+    def wait_for_next_cycle(self, seconds: int, progress_every: int) -> bool:
+        """
+        Wait between cycles, waking only to print progress every `progress_every` seconds
+        
+        Ctrl+C still raises KeyboardInterrupt immediately; stop() ends the wait early
+        
+        Returns:
+            bool: True if stop() was called during the wait
+        """
+        waited = 0
+        while waited < seconds:
+            step = min(progress_every, seconds - waited)
+            if self._stop_event.wait(step):
+                return True
+            waited += step
+            if waited < seconds:
+                log.info("   ⏱️  %s seconds remaining...", seconds - waited)
+        return False
+    
+    def stop(self):
+        """Ask a running continuous loop to finish (safe to call from another thread)"""
+        self._stop_event.set()
     
     def set_trading_mode(self, real_trading: bool):
         """Set trading mode - True for real money, False for simulation"""
         self.use_real_trading = real_trading
         mode = "REAL MONEY" if real_trading else "SIMULATION"
-        print(f"🔧 TRADING MODE SET TO: {mode}")
+        log.info("🔧 TRADING MODE SET TO: %s", mode)
         
         if real_trading:
-            print("⚠️  WARNING: REAL MONEY TRADING ENABLED!")
-            print("   All orders will use actual funds")
-            print("   Make sure credentials are properly configured")
+            log.warning("⚠️  WARNING: REAL MONEY TRADING ENABLED!")
+            log.info("   All orders will use actual funds")
+            log.info("   Make sure credentials are properly configured")
         else:
-            print("📊 Simulation mode - no real orders will be placed")
+            log.info("📊 Simulation mode - no real orders will be placed")
     
     def get_market_price(self, symbol: str) -> float:
-        """Get current market price for a symbol (placeholder implementation)"""
-        # In a real implementation, this would fetch from market data API
-        # For now, return a reasonable default for Brazilian stocks
-        default_prices = {
-            'PETR4': 25.50,
-            'VALE3': 62.30,
-            'ITUB4': 32.10,
-            'BBDC4': 14.80,
-            'ABEV3': 11.90,
-            'AMER3': 28.40,
-            'MGLU3': 8.50,
-            'LREN3': 45.20,
-            'RENT3': 58.70,
-            'EMBR3': 22.10
-        }
-        
-        return default_prices.get(symbol, 25.0)  # Default to 25.0 if not found
+        """Get current market price for a symbol (live quote, reference price if unavailable)"""
+        price = self.real_api.get_current_quote(symbol)
+        # A zero/negative quote must never become an order's limit price
+        if price is not None and price > 0:
+            return price
+        
+        log.warning("   ⚠️  No live quote for %s - using reference price", symbol)
+        return self.REFERENCE_PRICES.get(symbol, 25.0)  # Default to 25.0 if not found
     
     def validate_trading_setup(self) -> bool:
         """Validate that trading setup is ready"""
         if not self.use_real_trading:
-            print("✅ Simulation mode - no validation needed")
+            log.info("✅ Simulation mode - no validation needed")
             return True
         
-        print("🔍 VALIDATING REAL TRADING SETUP...")
+        log.info("🔍 VALIDATING REAL TRADING SETUP...")
         
         try:
             # Check if API is properly initialized
             if not hasattr(self, 'real_api') or not self.real_api:
-                print("❌ CedroTech API not initialized")
+                log.error("❌ CedroTech API not initialized")
                 return False
             
             # Check credentials
             if not self.real_api.username or not self.real_api.user_identifier or not self.real_api.account:
-                print("❌ Missing CedroTech credentials")
+                log.error("❌ Missing CedroTech credentials")
                 return False
             
-            print("✅ Real trading setup validated")
-            print(f"   Username: {self.real_api.username}")
-            print(f"   Account: {self.real_api.account}")
+            log.info("✅ Real trading setup validated")
+            log.info("   Username: %s", self.real_api.username)
+            log.info("   Account: %s", self.real_api.account)
+            
+            # Live orders are coming: open the order connection now, not on the first trade
+            if not self.real_api.warmup():
+                log.warning("⚠️  Could not pre-open the CedroTech connection - first order will connect on demand")
             return True
             
         except Exception as e:
-            print(f"❌ Validation error: {e}")
+            log.error("❌ Validation error: %s", e)
             return False
 
     def is_market_open(self) -> bool:
         """Check if market is currently open (Brazilian market hours)"""
         now = datetime.now()
         
-        # Brazilian market hours: 10:00 - 17:30 (BRT), Monday-Friday
         # For now, simplified check - in production use proper market calendar
         if now.weekday() >= 5:  # Weekend (Saturday=5, Sunday=6)
             return False
         
-        current_time = now.time()
-        market_open = datetime.strptime("10:00", "%H:%M").time()
-        market_close = datetime.strptime("17:30", "%H:%M").time()
+        return self.MARKET_OPEN <= now.time() <= self.MARKET_CLOSE
+    
+    def seconds_until_market_open(self) -> int:
+        """Seconds from now until the next weekday MARKET_OPEN"""
+        now = datetime.now()
+        next_open = datetime.combine(now.date(), self.MARKET_OPEN)
+        if next_open <= now:
+            next_open += timedelta(days=1)
+        while next_open.weekday() >= 5:  # Skip the weekend
+            next_open += timedelta(days=1)
         
-        return market_open <= current_time <= market_close
+        return max(1, int((next_open - now).total_seconds()) + 1)
     
-    def get_adaptive_cycle_interval(self) -> int:
+    def get_adaptive_cycle_interval(self, market_open: Optional[bool] = None) -> int:
         """Get adaptive cycle interval based on market conditions"""
-        if not self.is_market_open():
-            return 1800  # 30 minutes when market is closed
+        if market_open is None:
+            market_open = self.is_market_open()
+        
+        if not market_open:
+            # Nothing to analyze until the open - sleep straight through to it
+            return self.seconds_until_market_open()
         
         # During market hours, use shorter intervals
         if self.current_position:
@@ -667,13 +783,14 @@ class CedroTechTradingRobot:
     
     def run_continuous_monitoring(self):
         """Run continuous monitoring with adaptive intervals"""
-        print("🌟 STARTING CONTINUOUS MARKET MONITORING")
-        print("   Adaptive intervals based on market hours and position")
-        print("   Press Ctrl+C to stop")
-        print("=" * 80)
+        log.info("🌟 STARTING CONTINUOUS MARKET MONITORING")
+        log.info("   Adaptive intervals based on market hours and position")
+        log.info("   Press Ctrl+C to stop")
+        log.info("=" * 80)
         
         cycle_count = 0
         start_time = datetime.now()
+        self._stop_event.clear()
         
         try:
             while True:
@@ -681,62 +798,63 @@ class CedroTechTradingRobot:
                 
                 # Check market status
                 market_open = self.is_market_open()
-                interval = self.get_adaptive_cycle_interval()
+                interval = self.get_adaptive_cycle_interval(market_open)
                 
-                print(f"\n🔄 CYCLE {cycle_count}")
-                print(f"⏰ {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-                print(f"🏪 Market: {'OPEN' if market_open else 'CLOSED'}")
-                print(f"⏳ Next check in: {interval} seconds ({interval//60} minutes)")
-                print("-" * 50)
+                log.info("\n🔄 CYCLE %s", cycle_count)
+                log.info("⏰ %s", datetime.now().strftime('%Y-%m-%d %H:%M:%S'))
+                log.info("🏪 Market: %s", 'OPEN' if market_open else 'CLOSED')
+                log.info("⏳ Next check in: %s seconds (%s minutes)", interval, interval//60)
+                log.info("-" * 50)
                 
                 if market_open:
                     # Run full analysis during market hours
                     cycle_result = self.run_analysis_cycle()
                     
-                    if 'error' not in cycle_result:
+                    if 'error' not in cycle_result and log.isEnabledFor(logging.INFO):
                         recommended_asset = cycle_result.get('recommended_asset')
                         trading_action = cycle_result.get('trading_action', {})
                         
-                        print(f"\n📋 CYCLE SUMMARY:")
-                        print(f"   Recommended Asset: {recommended_asset or 'None'}")
-                        print(f"   Action Taken: {trading_action.get('action', 'Unknown')}")
-                        print(f"   Current Asset: {self.current_asset or 'None'}")
-                        print(f"   Total Trades: {self.trades_executed}")
+                        log.info("\n📋 CYCLE SUMMARY:")
+                        log.info("   Recommended Asset: %s", recommended_asset or 'None')
+                        log.info("   Action Taken: %s", trading_action.get('action', 'Unknown'))
+                        log.info("   Current Asset: %s", self.current_asset or 'None')
+                        log.info("   Total Trades: %s", self.trades_executed)
                 else:
                     # Market closed - just monitor and wait
-                    print("🏪 Market closed - monitoring mode")
-                    print(f"   Current Position: {self.current_asset or 'None'}")
-                    print("   Waiting for market to open...")
+                    log.info("🏪 Market closed - monitoring mode")
+                    log.info("   Current Position: %s", self.current_asset or 'None')
+                    log.info("   Waiting for market to open...")
                 
                 # Wait with progress updates
                 next_cycle_time = datetime.now() + timedelta(seconds=interval)
-                print(f"\n⏳ Next cycle at: {next_cycle_time.strftime('%H:%M:%S')}")
+                log.info("\n⏳ Next cycle at: %s", next_cycle_time.strftime('%H:%M:%S' if market_open else '%Y-%m-%d %H:%M:%S'))
                 
-                # Sleep in smaller chunks
-                for i in range(interval):
-                    time.sleep(1)
-                    if i > 0 and i % 300 == 0:  # Show progress every 5 minutes
-                        remaining = interval - i
-                        print(f"   ⏱️  {remaining} seconds remaining...")
+                # Show progress every 5 minutes (hourly while waiting for the open)
+                if self.wait_for_next_cycle(interval, progress_every=300 if market_open else 3600):
+                    log.info("\n🛑 MONITORING STOP REQUESTED")
+                    break
         
         except KeyboardInterrupt:
-            print(f"\n🛑 MONITORING STOPPED BY USER")
-            print(f"   Completed {cycle_count} cycles")
+            log.info("\n🛑 MONITORING STOPPED BY USER")
+            log.info("   Completed %s cycles", cycle_count)
             
         except Exception as e:
-            print(f"\n❌ MONITORING ERROR: {e}")
+            log.error("\n❌ MONITORING ERROR: %s", e)
             traceback.print_exc()
         
         finally:
             session_duration = datetime.now() - start_time
-            print(f"\n{self.generate_performance_report()}")
-            print(f"\n🏁 MONITORING SESSION ENDED")
-            print(f"   Total Cycles: {cycle_count}")
-            print(f"   Session Duration: {session_duration}")
+            if log.isEnabledFor(logging.INFO):
+                log.info("\n%s", self.generate_performance_report())
+            log.info("\n🏁 MONITORING SESSION ENDED")
+            log.info("   Total Cycles: %s", cycle_count)
+            log.info("   Session Duration: %s", session_duration)
 
     # ...existing code...
 def main():
     """Main function to run the CedroTech robot"""
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    
     print("🚀 INITIALIZING CEDROTECH ENHANCED ROBOT")
     print("=" * 60)
     
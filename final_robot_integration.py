@@ -10,9 +10,13 @@ sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 import json
 from datetime import datetime
+from operator import itemgetter
 from enhanced_day_trading_signals import enhanced_day_trading_signal
 from utils.quick_technical_analysis import get_price_signals  # Your working function
 
+# Your current asset universe
+DEFAULT_ASSETS = ['VALE3', 'PETR4', 'ITUB4', 'BBDC4', 'ABEV3', 'AMER3', 'MGLU3', 'LREN3', 'RENT3', 'EMBR3']
+
 def get_combined_signal_for_asset(ticker: str, quote_data: dict) -> dict:
     """
     Generate combined signal using WORKING components
@@ -216,17 +220,20 @@ def calculate_priority(signal: str, confidence: float, agreement: str) -> float:
     
     return base_score
 
-def enhanced_robot_analysis() -> dict:
+def enhanced_robot_analysis(assets: list = None) -> dict:
     """
     Run enhanced analysis on your asset universe
     This replaces the conservative analysis with actionable signals
+    
+    Args:
+        assets: Tickers to analyze in one pass (defaults to DEFAULT_ASSETS)
     """
     
     print("🤖 ENHANCED ROBOT ANALYSIS - COMBINED SIGNALS")
     print("=" * 70)
     
-    # Your current asset universe
-    assets = ['VALE3', 'PETR4', 'ITUB4', 'BBDC4', 'ABEV3', 'AMER3', 'MGLU3', 'LREN3', 'RENT3', 'EMBR3']
+    if assets is None:
+        assets = DEFAULT_ASSETS
     
     results = {
         'strong_buy': [],
@@ -294,10 +301,10 @@ def enhanced_robot_analysis() -> dict:
         except Exception as e:
             print(f"   ❌ Error analyzing {asset}: {e}")
     
-    # Sort by priority
+    # Sort by priority (every combined signal carries one)
     for category in results:
         if isinstance(results[category], list):
-            results[category].sort(key=lambda x: x.get('priority', 0), reverse=True)
+            results[category].sort(key=itemgetter('priority'), reverse=True)
     
     return results, all_signals
 
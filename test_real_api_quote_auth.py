@@ -0,0 +1,88 @@
+"""
+Test CedroTechRealAPI.get_current_quote session handling - a 401 on the quote
+endpoint must trigger one fresh SignIn and a retry instead of returning None
+"""
+
+import sys
+import os
+from unittest import mock
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import cedrotech_real_api
+
+class FakeResponse:
+    def __init__(self, status_code, content=b''):
+        self.status_code = status_code
+        self.content = content
+        self.text = content.decode()
+
+class FakeSession:
+    """Answers quote GETs from a scripted list of status codes; SignIn always succeeds"""
+
+    def __init__(self, quote_statuses):
+        self.quote_statuses = list(quote_statuses)
+        self.cookies = {}
+        self.sign_ins = 0
+        self.quote_requests = 0
+
+    def get(self, url, **kwargs):
+        self.quote_requests += 1
+        status = self.quote_statuses.pop(0)
+        return FakeResponse(status, b'{"lastTrade": 31.42}' if status == 200 else b'Unauthorized')
+
+    def post(self, url, **kwargs):
+        self.sign_ins += 1
+        self.cookies['JSESSIONID'] = f'session-{self.sign_ins}'
+        return FakeResponse(200)
+
+def make_api(session):
+    env = {'CEDROTECH_PLATAFORM': 'robot', 'CEDROTECH_PLAT_PASSWORD': 'secret'}
+    with mock.patch.dict(os.environ, env), \
+         mock.patch.object(cedrotech_real_api, 'get_shared_session', return_value=session):
+        return cedrotech_real_api.CedroTechRealAPI()
+
+def run_with_cookie_helpers_patched(api, symbol):
+    with mock.patch.object(cedrotech_real_api, 'restore_session_cookies', return_value=False), \
+         mock.patch.object(cedrotech_real_api, 'save_session_cookies'), \
+         mock.patch.object(cedrotech_real_api, 'clear_session_cookies') as clear:
+        return api.get_current_quote(symbol), clear
+
+def test_quote_signs_in_on_first_use():
+    session = FakeSession([200])
+    api = make_api(session)
+
+    price, _ = run_with_cookie_helpers_patched(api, 'PETR4')
+
+    assert price == 31.42
+    assert session.sign_ins == 1
+    assert api.authenticated
+
+def test_quote_reauthenticates_once_on_401():
+    session = FakeSession([401, 200])
+    api = make_api(session)
+    api.authenticated = True  # e.g. cookies restored from an earlier run, since expired
+
+    price, clear = run_with_cookie_helpers_patched(api, 'PETR4')
+
+    assert price == 31.42
+    assert session.sign_ins == 1
+    assert session.quote_requests == 2
+    clear.assert_called_once_with(session, 'robot')
+
+def test_quote_gives_up_after_second_401():
+    session = FakeSession([401, 401])
+    api = make_api(session)
+    api.authenticated = True
+
+    price, _ = run_with_cookie_helpers_patched(api, 'PETR4')
+
+    assert price is None
+    assert session.sign_ins == 1
+    assert session.quote_requests == 2
+    assert not api.authenticated
+
+if __name__ == "__main__":
+    test_quote_signs_in_on_first_use()
+    test_quote_reauthenticates_once_on_401()
+    test_quote_gives_up_after_second_401()
+    print("✅ get_current_quote 401 handling tests passed")
@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+"""
+Shared HTTP session for CedroTech webfeeder clients
+One keep-alive connection pool (and one set of auth cookies) per process
+
+Transport is HTTP/1.1: parallel fan-out (options chains, symbol probes) runs one
+request per pooled connection instead of multiplexing over HTTP/2, so POOL_SIZE
+is what bounds both concurrency and the number of TLS handshakes per host
+"""
+
+import os
+import socket
+import threading
+import time
+
+import orjson
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection
+from urllib3.util.retry import Retry
+
+POOL_SIZE = 32  # upper bound on concurrent requests across all CedroTech clients
+
+# urllib3's defaults (TCP_NODELAY) plus SO_KEEPALIVE, so idle pooled connections
+# aren't silently dropped by NAT between robot cycles and re-handshaken
+SOCKET_OPTIONS = HTTPConnection.default_socket_options + [(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)]
+
+SESSION_FILE = os.path.expanduser("~/.cedrotech_session.json")
+SESSION_TTL = 30 * 60  # seconds persisted SignIn cookies are trusted across runs
+
+# Cheap authenticated GET used to confirm restored cookies before SignIn is skipped
+SESSION_PROBE_PATH = "/services/quotes/markets"
+SESSION_PROBE_TIMEOUT = (1.0, 3.0)
+
+class RateLimiter:
+    """
+    Thread-safe token bucket: allows bursts up to `rate` requests, then `rate` per `per` seconds
+    """
+
+    def __init__(self, rate, per=1.0):
+        self.rate = rate / per  # tokens added per second
+        self.capacity = rate
+        self._tokens = float(rate)
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Take one token, sleeping only when the bucket is empty"""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._last) * self.rate)
+            self._last = now
+            # Reserve the token up front (may go negative) so waiting threads queue fairly
+            self._tokens -= 1
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+
+        if wait > 0:
+            time.sleep(wait)
+
+class _KeepAliveAdapter(HTTPAdapter):
+    """HTTPAdapter whose pooled connections are opened with SOCKET_OPTIONS"""
+
+    def init_poolmanager(self, *args, **kwargs):
+        kwargs.setdefault("socket_options", SOCKET_OPTIONS)
+        super().init_poolmanager(*args, **kwargs)
+
+_shared_session = None
+_session_lock = threading.Lock()
+_session_file_lock = threading.Lock()
+
+def get_shared_session():
+    """
+    Get the process-wide CedroTech session, creating it on first use
+
+    Returns:
+        requests.Session: Session shared by all CedroTech clients in this process
+    """
+    global _shared_session
+
+    if _shared_session is None:
+        with _session_lock:
+            if _shared_session is None:
+                session = requests.Session()
+                # trust_env stays on: this session also sends real-money orders, and
+                # deployments behind a proxy or a corporate CA rely on HTTP(S)_PROXY,
+                # NO_PROXY, REQUESTS_CA_BUNDLE and SSL_CERT_FILE being honoured
+                # Pool sized for the parallel symbol probes so concurrent requests
+                # don't queue on (or discard) connections from the default pool of 10.
+                # pool_block caps open sockets at POOL_SIZE: extra callers wait for a
+                # kept-alive connection instead of handshaking a throwaway one
+                adapter = _KeepAliveAdapter(
+                    pool_connections=POOL_SIZE,
+                    pool_maxsize=POOL_SIZE,
+                    pool_block=True,
+                    max_retries=Retry(
+                        total=3,
+                        backoff_factor=0.3,
+                        # 429 waits out the server's Retry-After on the same connection
+                        status_forcelist=(429, 502, 503, 504),
+                        respect_retry_after_header=True,
+                        raise_on_status=False
+                    )
+                )
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                _shared_session = session
+
+    return _shared_session
+
+def _load_saved_sessions():
+    """Read the username -> saved SignIn entry map from SESSION_FILE ({} if missing or unreadable)"""
+    try:
+        with open(SESSION_FILE, "rb") as f:
+            saved = orjson.loads(f.read())
+    except (OSError, orjson.JSONDecodeError):
+        return {}
+
+    users = saved.get("users") if isinstance(saved, dict) else None
+    return users if isinstance(users, dict) else {}
+
+def _write_saved_sessions(users):
+    """Atomically replace SESSION_FILE with the given username -> entry map"""
+    tmp_file = SESSION_FILE + ".tmp"
+    try:
+        # Cookies are credentials - keep the file private to the current user
+        fd = os.open(tmp_file, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, "wb") as f:
+            f.write(orjson.dumps({"users": users}))
+        os.replace(tmp_file, SESSION_FILE)
+    except OSError:
+        pass
+
+def restore_session_cookies(session, username, base_url):
+    """
+    Preload SignIn cookies saved by a previous run for this user, if they still work
+
+    Cookies younger than SESSION_TTL are loaded with their domain and path, then
+    checked with one GET to SESSION_PROBE_PATH: a session revoked server-side must
+    not leave the caller believing it is authenticated.
+
+    Args:
+        session (requests.Session): Session to load the cookies into
+        username (str): Platform login the cookies were saved for
+        base_url (str): CedroTech base URL used for the validation probe
+
+    Returns:
+        bool: True if cookies were restored, accepted by the server, and SignIn can be skipped
+    """
+    with _session_file_lock:
+        entry = _load_saved_sessions().get(username)
+
+    if not isinstance(entry, dict) or time.time() - entry.get("saved_at", 0) >= SESSION_TTL:
+        return False
+
+    cookies = entry.get("cookies")
+    if not cookies:
+        return False
+
+    try:
+        for cookie in cookies:
+            session.cookies.set(cookie["name"], cookie["value"],
+                                domain=cookie.get("domain", ""), path=cookie.get("path", "/"))
+        response = session.get(base_url + SESSION_PROBE_PATH, headers={"accept": "application/json"},
+                               timeout=SESSION_PROBE_TIMEOUT)
+        valid = response.status_code == 200
+    except (KeyError, TypeError, requests.RequestException):
+        valid = False
+
+    if not valid:
+        clear_session_cookies(session, username)
+    return valid
+
+def save_session_cookies(session, username):
+    """
+    Persist the session's SignIn cookies so the next run for this user can skip authentication
+
+    Args:
+        session (requests.Session): Authenticated session
+        username (str): Platform login the cookies belong to
+    """
+    now = time.time()
+    entry = {
+        "saved_at": now,
+        "cookies": [
+            {"name": cookie.name, "value": cookie.value, "domain": cookie.domain, "path": cookie.path}
+            for cookie in session.cookies
+        ]
+    }
+
+    with _session_file_lock:
+        # Other accounts' entries are kept; expired ones are dropped while rewriting
+        users = {user: saved for user, saved in _load_saved_sessions().items()
+                 if isinstance(saved, dict) and now - saved.get("saved_at", 0) < SESSION_TTL}
+        users[username] = entry
+        _write_saved_sessions(users)
+
+def clear_session_cookies(session=None, username=None):
+    """
+    Forget persisted SignIn cookies, e.g. after the server rejects them with a 401
+
+    Args:
+        session (requests.Session, optional): Session whose cookie jar should also be cleared
+        username (str, optional): Only forget this user's saved cookies (default: all users)
+    """
+    if session is not None:
+        session.cookies.clear()
+
+    with _session_file_lock:
+        if username is None:
+            try:
+                os.remove(SESSION_FILE)
+            except OSError:
+                pass
+            return
+
+        users = _load_saved_sessions()
+        if users.pop(username, None) is not None:
+            _write_saved_sessions(users)